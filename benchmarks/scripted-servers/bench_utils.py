@@ -3,6 +3,7 @@
 from __future__ import annotations
 
 import os
+import re
 import shutil
 import signal
 import subprocess
@@ -12,6 +13,13 @@ from dataclasses import dataclass
 from pathlib import Path
 from typing import Any, Dict, List, Optional, Sequence, Tuple
 
+# Number with an optional unit and "/s" rate suffix, e.g. "1,234" (commas removed first),
+# "3.21ms", "843.95KB/s".
+_NUM_UNIT_RE = re.compile(r"([0-9]+(?:\.[0-9]*)?)[ \t]*([A-Za-z]*)(/s)?")
+_SIZE_SCALE: Dict[str, float] = {"": 1, "B": 1, "KB": 1024, "MB": 1_048_576, "GB": 1_073_741_824}
+# Latencies are compared in microseconds.
+_TIME_SCALE: Dict[str, float] = {"us": 1, "ms": 1000, "s": 1_000_000}
+
 
 @dataclass
 class PerfRecording:
@@ -207,33 +215,41 @@ class TablePrinter:
             scenario_width + 3 + len(self.servers) * (cell_width + 3) + win_width + 2
         )
         border = "═" * interior
-        print("╔" + border + "╗")
+        out: List[str] = ["╔" + border + "╗"]
         for text in (title, subtitle):
             left = (interior - len(text)) // 2
             right = interior - len(text) - left
-            print(f"║{' ' * left}{text}{' ' * right}║")
-        print("╠" + border + "╣")
+            out.append(f"║{' ' * left}{text}{' ' * right}║")
+        out.append("╠" + border + "╣")
         header = [f"║ {'Scenario':<{scenario_width}} │"]
         for srv in self.servers:
             header.append(f" {srv:<{cell_width}} │")
         label = "Winner" if higher_is_better else "Best"
         header.append(f" {label:<{win_width}} ║")
-        print("".join(header))
-        print("╠" + border + "╣")
+        out.append("".join(header))
+        out.append("╠" + border + "╣")
+        best_by_scenario = {
+            scenario: self._best_server(scenario, data, higher_is_better)
+            for scenario in self.scenarios
+        }
+        # Width format specs parsed once, not per cell
+        scenario_fmt = f"║ {{:<{scenario_width}}} │".format
+        cell_fmt = f" {{:<{cell_width}}} │".format
+        best_cell_fmt = f" {{:<{cell_width - 2}}} \033[1;32m★\033[0m │".format
+        winner_fmt = f" {{:<{win_width}}} ║".format
         for scenario in self.scenarios:
-            row = [f"║ {scenario:<{scenario_width}} │"]
-            best_server = self._best_server(scenario, data, higher_is_better)
+            row = [scenario_fmt(scenario)]
+            best_server = best_by_scenario[scenario]
             for srv in self.servers:
-                val = data.get((srv, scenario), "-")
-                display = val
-                cell = f" {display:<{cell_width}} │"
+                display = data.get((srv, scenario), "-")
                 if srv == best_server and display != "-":
-                    truncated = display[: cell_width - 2]
-                    cell = f" {truncated:<{cell_width - 2}} \033[1;32m★\033[0m │"
-                row.append(cell)
-            row.append(f" {best_server or '-':<{win_width}} ║")
-            print("".join(row))
-        print("╚" + border + "╝\n")
+                    row.append(best_cell_fmt(display[: cell_width - 2]))
+                else:
+                    row.append(cell_fmt(display))
+            row.append(winner_fmt(best_server or "-"))
+            out.append("".join(row))
+        out.append("╚" + border + "╝\n")
+        sys.stdout.write("\n".join(out) + "\n")
 
     def _best_server(
         self, scenario: str, data: Dict[Tuple[str, str], str], higher_is_better: bool
@@ -256,27 +272,17 @@ class TablePrinter:
 
     @staticmethod
     def _to_numeric(value: str, _higher_is_better: bool) -> Optional[float]:
-        try:
-            cleaned = value.replace(",", "")
-            # Data-rate values (e.g. h2load's "843.95KB/s") end in "/s", which also ends in the
-            # bare letter "s" — strip the rate suffix *before* the latency check below, otherwise
-            # "KB/s" / "MB/s" / "GB/s" get treated as an unrecognized time unit (scale 1) and
-            # byte-size values of different magnitudes get compared as if they were the same unit.
-            is_rate = cleaned.endswith("/s")
-            if is_rate:
-                cleaned = cleaned[: -len("/s")]
-            if is_rate or any(cleaned.endswith(unit) for unit in ("KB", "MB", "GB", "B")):
-                suffix = "".join(ch for ch in cleaned if not ch.isdigit() and ch != ".")
-                number = float("".join(ch for ch in cleaned if ch.isdigit() or ch == "."))
-                scale = {"B": 1, "KB": 1024, "MB": 1_048_576, "GB": 1_073_741_824}.get(
-                    suffix, 1
-                )
-                return number * scale
-            if any(cleaned.endswith(unit) for unit in ("us", "ms", "s")):
-                suffix = "".join(ch for ch in cleaned if not ch.isdigit() and ch != ".")
-                number = float("".join(ch for ch in cleaned if ch.isdigit() or ch == "."))
-                scale = {"us": 1, "ms": 1000, "s": 1_000_000}.get(suffix, 1)
-                return number * scale
-            return float(cleaned)
-        except ValueError:
+        match = _NUM_UNIT_RE.fullmatch(value.replace(",", "").strip())
+        if match is None:
             return None
+        number, unit, rate = match.groups()
+        if rate:
+            # Data-rate values (e.g. h2load's "843.95KB/s") are byte sizes per second: the
+            # trailing "s" must not be read as the seconds latency unit, otherwise byte-size
+            # values of different magnitudes get compared as if they were the same unit.
+            scale = _SIZE_SCALE.get(unit, 1)
+        else:
+            scale = _SIZE_SCALE.get(unit) or _TIME_SCALE.get(unit)
+            if scale is None:
+                return None
+        return float(number) * scale
@@ -3,10 +3,15 @@
 from __future__ import annotations
 
 import argparse
+import bisect
+import errno
+import functools
+import http.client
 import json
 import os
 import re
 import resource
+import select
 import shutil
 import signal
 import socket
@@ -15,9 +20,11 @@ import subprocess
 import sys
 import time
 import urllib.request
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
+from operator import itemgetter
 from pathlib import Path
-from typing import Any, Dict, List, Optional, Sequence, Tuple
+from typing import Any, BinaryIO, Dict, FrozenSet, List, Optional, Sequence, Set, TextIO, Tuple
 
 # ----------------------------- Data structures ----------------------------- #
 
@@ -76,6 +83,105 @@ class BenchmarkError(RuntimeError):
     pass
 
 
+# /proc/<pid>/status fields aggregated into MemoryStats (values are kB, except Threads).
+_STATUS_FIELDS_RE = re.compile(rb"^(VmRSS|VmPeak|VmHWM|VmSize|VmSwap|Threads):[ \t]*(\d+)", re.MULTILINE)
+_STATUS_FIELD_MAP = {
+    b"VmRSS": "rss_kb",
+    b"VmPeak": "peak_kb",
+    b"VmHWM": "hwm_kb",
+    b"VmSize": "vm_size_kb",
+    b"VmSwap": "vm_swap_kb",
+    b"Threads": "threads",
+}
+
+# Pid / PPid lines of /proc/<pid>/status. The trailing newline makes a line cut off by a
+# partial read not match.
+_PID_RE = re.compile(rb"^Pid:[ \t]*(\d+)\n", re.MULTILINE)
+_PPID_RE = re.compile(rb"^PPid:[ \t]*(\d+)\n", re.MULTILINE)
+
+# wrk summary lines, matched in one pass over the whole output by _parse_wrk_output.
+_WRK_SUMMARY_RE = re.compile(
+    r"^[ \t]*Non-2xx(?P<non2xx>[^\n]*)"
+    r"|(?P<requests>\d+)[ \t]+requests[ \t]+in[ \t]+(?P<duration>[0-9]*\.?[0-9]+)s"
+    r"|^[ \t]*Requests/sec[^:\n]*:[ \t]*(?P<rps>[^\n]*?)[ \t]*$"
+    r"|^[ \t]*Latency\S*[ \t]+(?P<latency>\S+)"
+    r"|^[ \t]*Transfer/sec[^:\n]*:[ \t]*(?P<transfer>[^\n]*?)[ \t]*$",
+    re.MULTILINE,
+)
+
+
+def _read_proc_file(path: str) -> Optional[bytes]:
+    """Read a small /proc file with raw fd syscalls (open/read/close only).
+
+    Skips the buffered file object machinery (fstat, isatty ioctl, lseek) that
+    ``open()``/``Path.read_bytes()`` pay on every call; /proc files are generated on
+    read, so there is nothing to gain from buffering. Returns None if the file is gone
+    (e.g. the process exited)."""
+    try:
+        fd = os.open(path, os.O_RDONLY | os.O_CLOEXEC)
+    except OSError:
+        return None
+    try:
+        chunks = []
+        while True:
+            chunk = os.read(fd, 65536)
+            if not chunk:
+                break
+            chunks.append(chunk)
+        return b"".join(chunks)
+    except OSError:
+        return None
+    finally:
+        os.close(fd)
+
+
+def _read_proc_head(path: str, size: int = 256) -> Optional[bytes]:
+    """Read at most ``size`` bytes from the start of a /proc file with a single read.
+
+    For lookups of fields near the top of the file (Pid/PPid of /proc/<pid>/status sit
+    within the first ~100 bytes), so the kernel does not format and copy the rest."""
+    try:
+        fd = os.open(path, os.O_RDONLY | os.O_CLOEXEC)
+    except OSError:
+        return None
+    try:
+        return os.read(fd, size)
+    except OSError:
+        return None
+    finally:
+        os.close(fd)
+
+
+@functools.lru_cache(maxsize=None)
+def _system_info() -> str:
+    """``uname -a``-like description of the host, without forking uname."""
+    return " ".join(os.uname())
+
+
+@functools.lru_cache(maxsize=None)
+def _cpu_model_name() -> str:
+    """First 'model name' of /proc/cpuinfo, reading only up to that line."""
+    try:
+        with open("/proc/cpuinfo", encoding="utf-8", errors="replace") as fp:
+            for line in fp:
+                if line.startswith("model name"):
+                    return line.split(":", 1)[1].strip()
+    except OSError:
+        pass
+    return ""
+
+
+# Thousands separators dropped before float() parsing of formatted numbers (e.g. "12,345").
+_COMMA_TABLE = str.maketrans("", "", ",")
+
+# 1/1024 is a power of two, so multiplying by it is exact: same result as kb / 1024.
+_KB_TO_MB = 1.0 / 1024.0
+
+# Badge colors by best req/s: _BADGE_COLORS[i] applies from _BADGE_THRESHOLDS[i - 1] up.
+_BADGE_THRESHOLDS: Tuple[int, ...] = (10_000, 50_000, 100_000, 200_000)
+_BADGE_COLORS: Tuple[str, ...] = ("lightgrey", "yellow", "yellowgreen", "green", "brightgreen")
+
+
 # ----------------------------- Runner class -------------------------------- #
 
 
@@ -92,13 +198,21 @@ class BenchmarkRunner:
         "beast": 8089,
     }
 
-    SERVER_ORDER = ["aeronet", "drogon", "pistache", "crow", "beast", "rust", "undertow", "go", "python"]
+    SERVER_ORDER: Tuple[str, ...] = ("aeronet", "drogon", "pistache", "crow", "beast", "rust", "undertow", "go", "python")
+
+    _SERVER_NAMES: FrozenSet[str] = frozenset(SERVER_PORTS)
 
     # Servers that support HTTP/2 benchmarks (pistache, crow, drogon and beast lack H2 server support)
-    H2_SERVER_ORDER = ["aeronet", "rust", "undertow", "go", "python"]
+    H2_SERVER_ORDER: Tuple[str, ...] = ("aeronet", "rust", "undertow", "go", "python")
 
     # Servers that only support H2 over TLS (not h2c cleartext)
-    H2_TLS_ONLY_SERVERS: set = set()
+    H2_TLS_ONLY_SERVERS: FrozenSet[str] = frozenset()
+
+    # Servers that fork worker processes (uvicorn --workers); all others are a single
+    # process, so their memory is read from their own /proc/<pid>/status only.
+    MULTI_PROC_SERVERS: FrozenSet[str] = frozenset({"python"})
+    # Above this many child processes, their status files are read by a thread pool.
+    _PARALLEL_STATUS_READS = 8
 
     SCENARIOS: Dict[str, Scenario] = {
         "headers": Scenario("headers", "lua/headers_stress.lua", "/headers"),
@@ -137,6 +251,10 @@ class BenchmarkRunner:
         ),
     }
 
+    _RESTART_SCENARIOS: FrozenSet[str] = frozenset(
+        name for name, scenario in SCENARIOS.items() if scenario.requires_restart
+    )
+
     # H2 scenario definitions for h2load benchmarks.
     # Maps the same scenario names to h2load-friendly parameters.
     H2_SCENARIOS: Dict[str, H2Scenario] = {
@@ -164,14 +282,18 @@ class BenchmarkRunner:
         "routing": H2Scenario("routing", "/r500", requires_restart=True),
     }
 
+    _H2_RESTART_SCENARIOS: FrozenSet[str] = frozenset(
+        name for name, scenario in H2_SCENARIOS.items() if scenario.requires_restart
+    )
+
     # URIs for the 'mixed' h2load scenario - distributed round-robin
-    H2_MIXED_ENDPOINTS = [
+    H2_MIXED_ENDPOINTS: Tuple[str, ...] = (
         "/ping",
         "/headers?count=50&size=128",
         "/body?size=4096",
         "/compute?complexity=25&hash_iters=500",
         "/json?items=10",
-    ]
+    )
 
     def __init__(self, args: argparse.Namespace) -> None:
         self.args = args
@@ -180,7 +302,14 @@ class BenchmarkRunner:
         self.build_dir = self._find_build_dir()
 
         self.threads = max(1, args.threads)
-        self.cpu_count = os.cpu_count() or 1
+        # CPUs this process may run on: in a container or under a cpuset this can be a
+        # subset of the machine (e.g. CPUs 4-7), so pinning must use these ids rather
+        # than assuming 0..cpu_count-1.
+        if hasattr(os, "sched_getaffinity"):
+            self._allowed_cpus: List[int] = sorted(os.sched_getaffinity(0))
+        else:
+            self._allowed_cpus = list(range(os.cpu_count() or 1))
+        self.cpu_count = len(self._allowed_cpus) or 1
         # Pin the server and the load generator (wrk/h2load) to disjoint CPU cores so we
         # measure server throughput rather than scheduler contention. Only possible on
         # Linux with taskset(1) and enough cores; disabled otherwise (e.g. 2-core CI VMs).
@@ -189,6 +318,12 @@ class BenchmarkRunner:
             and sys.platform.startswith("linux")
             and shutil.which("taskset") is not None
         )
+        # Drop the kernel page cache before each measured 'files' sample so every server
+        # is measured from the same cold cache (needs root; skipped otherwise).
+        self._drop_caches_enabled = getattr(args, "drop_caches", False)
+        # VmHWM is reset before every measured scenario (see _reset_peak_rss); cleared as
+        # soon as one reset fails, since the column then mixes in process-lifetime peaks.
+        self._peak_rss_per_scenario = True
         self.connections = args.connections
         self.duration = args.duration
         self.warmup = args.warmup
@@ -211,6 +346,8 @@ class BenchmarkRunner:
         self.logs_dir.mkdir(exist_ok=True)
         timestamp = time.strftime("%Y%m%d_%H%M%S")
         self.result_file = self.output_dir / f"benchmark_{timestamp}.txt"
+        self._result_fp: Optional[TextIO] = None
+        self._devnull: Optional[BinaryIO] = None
         self.profiler: Optional[PerfProfiler] = None
         if args.profile:
             try:
@@ -229,6 +366,8 @@ class BenchmarkRunner:
 
         self.server_processes: Dict[str, ProcessHandle] = {}
         self.results_rps: Dict[Tuple[str, str], str] = {}
+        # Numeric view of results_rps, parsed once when a result is stored ("-" is absent).
+        self._rps_numeric: Dict[Tuple[str, str], float] = {}
         self.results_rps_raw: Dict[Tuple[str, str], str] = {}
         self.results_latency: Dict[Tuple[str, str], str] = {}
         self.results_latency_raw: Dict[Tuple[str, str], str] = {}
@@ -237,6 +376,17 @@ class BenchmarkRunner:
         self.results_timeouts: Dict[Tuple[str, str], int] = {}
         self.memory_usage: Dict[Tuple[str, str], MemoryStats] = {}
 
+        # Per-run caches: server availability and the resolved (built) base command
+        # line, so toolchain lookups and build checks run once per server, not per start.
+        self._server_availability: Dict[str, bool] = {}
+        self._server_commands: Dict[str, Tuple[List[str], Optional[Path]]] = {}
+        self._base_env: Optional[Dict[str, str]] = None
+        self._server_envs: Dict[str, Dict[str, str]] = {}
+        self._probe_ssl_contexts: Dict[bool, ssl.SSLContext] = {}
+        # (monotonic timestamp, pid -> ppid) of the last /proc scan, see _build_ppid_map.
+        self._ppid_map_cache: Tuple[float, Dict[int, int]] = (0.0, {})
+        # (static args, TLS args) for servers, see _resource_server_args.
+        self._resource_args: Optional[Tuple[Tuple[str, ...], Tuple[str, ...]]] = None
         self.servers_to_test = self._resolve_server_filter(args.server)
         self.scenarios_to_test = self._resolve_scenario_filter(args.scenario)
 
@@ -256,18 +406,14 @@ class BenchmarkRunner:
     # ------------------------- Setup helper methods ------------------------- #
 
     def _detect_repo_script_dir(self) -> Path:
-        try:
-            git_top = subprocess.run(
-                ["git", "rev-parse", "--show-toplevel"],
-                capture_output=True,
-                text=True,
-                check=True,
-            ).stdout.strip()
-            candidate = Path(git_top) / "benchmarks" / "scripted-servers"
-            if candidate.is_dir():
-                return candidate
-        except Exception:
-            pass
+        # Walk up to the git work tree root ('.git' is a directory, or a file for
+        # worktrees/submodules) instead of forking `git rev-parse --show-toplevel`.
+        for parent in (self.script_dir, *self.script_dir.parents):
+            if (parent / ".git").exists():
+                candidate = parent / "benchmarks" / "scripted-servers"
+                if candidate.is_dir():
+                    return candidate
+                break
         # fallback: assume repo root is two levels up
         return (
             (self.script_dir / ".." / "..").resolve()
@@ -305,23 +451,26 @@ class BenchmarkRunner:
             if all_h1:
                 print(f"Note: {', '.join(sorted(all_h1))} excluded from H2 benchmarks (no HTTP/2 server support)")
         if server_arg.startswith("all"):
-            available = []
+            candidates = []
             for name in order:
                 if name == "python" and server_arg.endswith("-except-python"):
                     continue
                 if is_h2 and self.protocol == "h2c" and name in self.H2_TLS_ONLY_SERVERS:
                     print(f"Skipping {name} for h2c (TLS-only H2 support)")
                     continue
-                if self._server_available(name):
-                    available.append(name)
+                candidates.append(name)
+            availability = self._probe_servers(candidates)
+            available = [name for name in candidates if availability[name]]
             if not available:
                 raise BenchmarkError("No servers available to test")
             return available
         names = [s.strip() for s in server_arg.split(",") if s.strip()]
         for name in names:
-            if name not in self.SERVER_PORTS:
+            if name not in self._SERVER_NAMES:
                 raise BenchmarkError(f"Unknown server: {name}")
-            if not self._server_available(name):
+        availability = self._probe_servers(names)
+        for name in names:
+            if not availability[name]:
                 raise BenchmarkError(
                     f"Server '{name}' is not available (missing binary or toolchain)"
                 )
@@ -354,42 +503,65 @@ class BenchmarkRunner:
                 raise BenchmarkError(f"Unknown scenario: {sc}")
         return scenarios
 
+    def _probe_servers(self, names: Sequence[str]) -> Dict[str, bool]:
+        """Check availability of ``names`` concurrently.
+
+        Probing builds the Go/Rust/Undertow servers and downloads the Undertow JARs when
+        needed; these use independent toolchains and output directories, so they are
+        overlapped instead of paying each build in turn. Measurements stay serial."""
+        unique = list(dict.fromkeys(names))
+        if len(unique) <= 1:
+            return {name: self._server_available(name) for name in unique}
+        with ThreadPoolExecutor(max_workers=len(unique)) as pool:
+            return dict(zip(unique, pool.map(self._server_available, unique)))
+
     def _server_available(self, name: str) -> bool:
+        cached = self._server_availability.get(name)
+        if cached is not None:
+            return cached
         try:
             self._prepare_server_command(name, extra_args=None)
-            return True
+            available = True
         except BenchmarkError as exc:
             print(f"Server '{name}' is not available: {exc}")
-            return False
+            available = False
+        self._server_availability[name] = available
+        return available
 
     # --------------------------- Build helpers ----------------------------- #
 
     def _prepare_server_command(
         self, name: str, extra_args: Optional[Sequence[str]]
     ) -> Tuple[List[str], Optional[Path]]:
-        extra_args = list(extra_args or [])
+        base = self._server_commands.get(name)
+        if base is None:
+            base = self._resolve_server_command(name)
+            self._server_commands[name] = base
+        cmd, cwd = base
+        return [*cmd, *(extra_args or [])], cwd
+
+    def _resolve_server_command(self, name: str) -> Tuple[List[str], Optional[Path]]:
         if name in {"aeronet", "drogon", "pistache", "crow", "beast"}:
             binary = self.build_dir / f"{name}-bench-server"
             if not binary.is_file():
                 raise BenchmarkError(f"Binary not found for {name}: {binary}")
-            return [str(binary), *extra_args], None
+            return [str(binary)], None
         if name == "go":
             go_bin = self._ensure_go_server_built()
-            return [str(go_bin), *extra_args], go_bin.parent
+            return [str(go_bin)], go_bin.parent
         if name == "python":
             python_script = self._find_python_server_script()
             return [
                 sys.executable or "python3",
                 str(python_script),
-                *extra_args,
             ], python_script.parent
         if name == "undertow":
             undertow_dir, classpath = self._ensure_undertow_server_built()
-            cmd = ["java", "-cp", classpath, "UndertowBenchServer", *extra_args]
+            cmd = ["java", "-cp", classpath, "UndertowBenchServer"]
             return cmd, undertow_dir
         if name == "rust":
             rust_bin = self._ensure_rust_server_built()
-            return [str(rust_bin), *extra_args], rust_bin.parent
+            return [str(rust_bin)], rust_bin.parent
         raise BenchmarkError(f"Unsupported server: {name}")
 
     def _ensure_go_server_built(self) -> Path:
@@ -500,18 +672,24 @@ class BenchmarkRunner:
             "smallrye-common-ref-2.19.0.jar": f"{base_url}/io/smallrye/common/smallrye-common-ref/2.19.0/smallrye-common-ref-2.19.0.jar",
             "smallrye-common-constraint-2.19.0.jar": f"{base_url}/io/smallrye/common/smallrye-common-constraint/2.19.0/smallrye-common-constraint-2.19.0.jar",
         }
-        for jar in jars:
-            jar_path = undertow_dir / jar
-            if not jar_path.is_file():
-                url = jar_urls[jar]
-                print(f"Downloading {jar}...")
-                urllib.request.urlretrieve(url, jar_path)
+        missing = [jar for jar in jars if not (undertow_dir / jar).is_file()]
+        if missing:
+            # Downloads are latency-bound; fetch them concurrently.
+            with ThreadPoolExecutor(max_workers=len(missing)) as pool:
+                list(pool.map(lambda jar: self._download_jar(jar_urls[jar], undertow_dir / jar), missing))
         classpath = ":".join(["."] + [jar for jar in jars])
-        class_files = list(undertow_dir.glob("*.class"))
-        needs_recompile = not class_files
-        if not needs_recompile:
-            source_mtime = source_file.stat().st_mtime
-            needs_recompile = any(source_mtime > class_file.stat().st_mtime for class_file in class_files)
+        # Recompile when there is no .class file or any of them is older than the source;
+        # a single directory scan that stops at the first stale class file.
+        source_mtime = source_file.stat().st_mtime
+        needs_recompile = True
+        with os.scandir(undertow_dir) as entries:
+            for entry in entries:
+                if not entry.name.endswith(".class"):
+                    continue
+                if source_mtime > entry.stat().st_mtime:
+                    needs_recompile = True
+                    break
+                needs_recompile = False
         if needs_recompile:
             print("Compiling Undertow benchmark server...")
             try:
@@ -526,6 +704,15 @@ class BenchmarkRunner:
                 ) from exc
         return undertow_dir, classpath
 
+    @staticmethod
+    def _download_jar(url: str, jar_path: Path) -> None:
+        print(f"Downloading {jar_path.name}...")
+        # Download to a side file so an interrupted fetch never leaves a truncated JAR
+        # that would be mistaken for a complete one on the next run.
+        part_path = jar_path.with_name(jar_path.name + ".part")
+        urllib.request.urlretrieve(url, part_path)
+        part_path.replace(jar_path)
+
     def _find_python_server_script(self) -> Path:
         candidates = [
             self.script_dir / "python_server.py",
@@ -560,24 +747,37 @@ class BenchmarkRunner:
             self._prepare_h2load_body_files()
         else:
             self._ensure_wrk_available()
-        self._write_result_header()
-        self._prepare_resources_if_needed()
-        tool = "h2load" if is_h2 else "wrk"
-        print(f"Starting benchmarks (protocol={self.protocol}, tool={tool})...\n")
-        print(f"Results will be saved to: {self.result_file}\n")
-        try:
-            for server in self.servers_to_test:
-                if is_h2:
-                    self._run_server_suite_h2(server)
-                else:
-                    self._run_server_suite(server)
-        finally:
-            self._stop_all_servers()
-        self._print_results_table()
-        self._print_memory_table()
-        self._write_memory_summary_table()
-        self._write_summary_table()
-        self._write_json_summary()
+        self._raise_fd_limit()
+        # The result file stays open for the whole run; every writer goes through it
+        # instead of reopening the file per scenario, and each finished scenario block is
+        # flushed so an interrupted run keeps what it measured. Likewise a single
+        # /dev/null handle absorbs the output of every warm-up run.
+        with self.result_file.open(
+            "w", encoding="utf-8", buffering=1 << 16
+        ) as result_fp, open(os.devnull, "wb") as devnull:
+            self._result_fp = result_fp
+            self._devnull = devnull
+            self._write_result_header()
+            self._prepare_resources_if_needed()
+            tool = "h2load" if is_h2 else "wrk"
+            print(f"Starting benchmarks (protocol={self.protocol}, tool={tool})...\n")
+            print(f"Results will be saved to: {self.result_file}\n")
+            try:
+                for server in self.servers_to_test:
+                    if is_h2:
+                        self._run_server_suite_h2(server)
+                    else:
+                        self._run_server_suite(server)
+            finally:
+                self._stop_all_servers()
+            self._print_results_table()
+            memory_rows = self._render_memory_rows()
+            self._print_memory_table(memory_rows)
+            self._write_memory_summary_table(memory_rows)
+            self._write_summary_table()
+            self._write_json_summary()
+        self._result_fp = None
+        self._devnull = None
         # CI smoke gate: fail the run when aeronet (the project's own server) is broken,
         # while tolerating environmental flakiness that also hits competitors. Only armed
         # when aeronet is actually under test.
@@ -652,8 +852,8 @@ class BenchmarkRunner:
         print(f"Testing: {server}")
         print("==========================================")
         scenarios = [sc for sc in self.scenarios_to_test if sc in self.SCENARIOS]
-        normal = [sc for sc in scenarios if not self.SCENARIOS[sc].requires_restart]
-        special = [sc for sc in scenarios if self.SCENARIOS[sc].requires_restart]
+        normal = [sc for sc in scenarios if sc not in self._RESTART_SCENARIOS]
+        special = [sc for sc in scenarios if sc in self._RESTART_SCENARIOS]
 
         if normal:
             if self._start_server(
@@ -710,40 +910,11 @@ class BenchmarkRunner:
             # taskset execs the server in place, so the tracked PID stays the server's.
             cmd = [*pin_prefix, *cmd]
             print(f"Pinning {server} to CPUs {pin_prefix[-1]} (server threads: {self.threads})")
-        env = os.environ.copy()
-        env["BENCH_PORT"] = str(port)
-        env["BENCH_THREADS"] = str(self.threads)
-
-        # Optional server-specific profiler/runtime environment passthrough.
-        # This allows profiling wrappers to instrument only the server process
-        # (e.g. aeronet) without affecting wrk/python orchestrator processes.
-        server_key = server.upper()
-        profiler_vars = (
-            "LD_PRELOAD",
-            "HEAPPROFILE",
-            "HEAP_PROFILE_ALLOCATION_INTERVAL",
-            "HEAPPROFILESIGNAL",
-            "CPUPROFILE",
-            "CPUPROFILE_FREQUENCY",
-        )
-        for var_name in profiler_vars:
-            if var_name in env:
-                env.pop(var_name, None)
-            scoped_key = f"BENCH_{server_key}_{var_name}"
-            scoped_val = os.environ.get(scoped_key)
-            if scoped_val:
-                env[var_name] = scoped_val
+        env = self._server_env(server, port)
 
         log_path = self.logs_dir / f"{server}.log"
         log_fp = log_path.open("w", encoding="utf-8", errors="replace")
 
-        def _preexec() -> None:
-            """New session + raise fd limit so benchmarks with many connections don't hit EMFILE."""
-            os.setsid()
-            soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
-            if soft < hard:
-                resource.setrlimit(resource.RLIMIT_NOFILE, (hard, hard))
-
         try:
             popen = subprocess.Popen(
                 cmd,
@@ -751,7 +922,9 @@ class BenchmarkRunner:
                 stderr=subprocess.STDOUT,
                 cwd=cwd or self.script_dir,
                 env=env,
-                preexec_fn=_preexec,
+                # New session so _stop_server can signal the whole process group. The fd
+                # limit is inherited from this process (see _raise_fd_limit).
+                start_new_session=True,
             )
         except Exception as exc:
             log_fp.close()
@@ -767,6 +940,51 @@ class BenchmarkRunner:
         print(f"{server} server ready (PID: {popen.pid})")
         return True
 
+    # Profiler/runtime variables never inherited by servers; they are only set through
+    # the server-scoped BENCH_<SERVER>_<VAR> form (see _server_env).
+    _SERVER_PROFILER_VARS = (
+        "LD_PRELOAD",
+        "HEAPPROFILE",
+        "HEAP_PROFILE_ALLOCATION_INTERVAL",
+        "HEAPPROFILESIGNAL",
+        "CPUPROFILE",
+        "CPUPROFILE_FREQUENCY",
+    )
+
+    def _server_env(self, server: str, port: int) -> Dict[str, str]:
+        """Environment of a server process, built once per server and reused on restarts."""
+        env = self._server_envs.get(server)
+        if env is not None:
+            return env
+        if self._base_env is None:
+            self._base_env = {
+                key: value
+                for key, value in os.environ.items()
+                if key not in self._SERVER_PROFILER_VARS
+            }
+        env = self._base_env | {"BENCH_PORT": str(port), "BENCH_THREADS": str(self.threads)}
+        # Optional server-specific profiler/runtime environment passthrough.
+        # This allows profiling wrappers to instrument only the server process
+        # (e.g. aeronet) without affecting wrk/python orchestrator processes.
+        server_key = server.upper()
+        for var_name in self._SERVER_PROFILER_VARS:
+            scoped_val = os.environ.get(f"BENCH_{server_key}_{var_name}")
+            if scoped_val:
+                env[var_name] = scoped_val
+        self._server_envs[server] = env
+        return env
+
+    @staticmethod
+    def _raise_fd_limit() -> None:
+        """Raise the soft fd limit to the hard limit so that servers and load generators
+        (which inherit it) don't hit EMFILE with many connections.
+
+        Done once in this process rather than in a ``preexec_fn``, which would run Python
+        code between fork and exec for every server start."""
+        soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+        if soft < hard:
+            resource.setrlimit(resource.RLIMIT_NOFILE, (hard, hard))
+
     def _stop_server(self, server: str) -> None:
         handle = self.server_processes.pop(server, None)
         if not handle:
@@ -825,10 +1043,21 @@ class BenchmarkRunner:
             return self.threads
         return min(self.threads * scenario.wrk_thread_multiplier, spare)
 
-    @staticmethod
-    def _cpu_range(start: int, count: int) -> str:
-        """Contiguous CPU list for `taskset -c`, e.g. (0, 5) -> '0-4', (5, 1) -> '5'."""
-        return str(start) if count <= 1 else f"{start}-{start + count - 1}"
+    def _cpu_range(self, start: int, count: int) -> str:
+        """CPU list for `taskset -c` covering ``count`` allowed CPUs from index ``start``.
+
+        Consecutive ids are collapsed, e.g. allowed CPUs 0-7: (0, 5) -> '0-4',
+        (5, 1) -> '5'; allowed CPUs {2, 3, 6, 7}: (0, 3) -> '2-3,6'."""
+        cpus = self._allowed_cpus[start:start + count]
+        spans: List[str] = []
+        first = prev = cpus[0]
+        for cpu in cpus[1:]:
+            if cpu != prev + 1:
+                spans.append(str(first) if first == prev else f"{first}-{prev}")
+                first = cpu
+            prev = cpu
+        spans.append(str(first) if first == prev else f"{first}-{prev}")
+        return ",".join(spans)
 
     def _server_pin_prefix(self) -> List[str]:
         """`taskset` prefix pinning the server to the first ``self.threads`` cores.
@@ -926,6 +1155,10 @@ class BenchmarkRunner:
         wrk_pin = self._loadgen_pin_prefix(wrk_threads)
         if warmup:
             print(f">>> Warm-up: {server} / {scenario_name}")
+            # Warm-up is deliberately a separate wrk process: wrk's summary and latency
+            # histogram (what done() and our parsers read) always cover the whole run, so
+            # folding warm-up into the measured invocation would leak cold-start samples
+            # into the reported numbers. The extra fork+exec is negligible next to -d.
             warmup_cmd = [
                 *wrk_pin,
                 "wrk",
@@ -938,7 +1171,7 @@ class BenchmarkRunner:
                 url,
             ]
             subprocess.run(
-                warmup_cmd, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+                warmup_cmd, stdout=self._discard_sink(), stderr=subprocess.STDOUT
             )
             if warmup_only:
                 return
@@ -963,9 +1196,11 @@ class BenchmarkRunner:
         # Take `self.repeat` samples and keep the median-throughput one. A failed sample
         # is tolerated as long as at least one succeeds (repeats exist to be robust to
         # transient blips); only an all-failed measurement is recorded as a failure.
+        self._reset_peak_rss(server)
         outputs: List[str] = []
         last_fail_output = ""
         for sample in range(self.repeat):
+            self._maybe_drop_caches(scenario_name)
             recording = self._start_perf_profile(server, scenario_name, sample)
             try:
                 result = subprocess.run(
@@ -1053,6 +1288,11 @@ class BenchmarkRunner:
         )
         self._record_memory_usage(server, scenario_name)
 
+    def _discard_sink(self) -> Any:
+        """Output target for discarded (warm-up) output: the /dev/null handle shared by
+        the whole run, so each warm-up does not reopen /dev/null for its stdio."""
+        return self._devnull if self._devnull is not None else subprocess.DEVNULL
+
     # ---------------------- HTTP/2 h2load benchmark logic -------------------- #
 
     def _ensure_h2load_available(self) -> None:
@@ -1082,8 +1322,8 @@ class BenchmarkRunner:
         print(f"Testing: {server} [{self.protocol}]")
         print("==========================================")
         scenarios = [sc for sc in self.scenarios_to_test if sc in self.H2_SCENARIOS]
-        normal = [sc for sc in scenarios if not self.H2_SCENARIOS[sc].requires_restart]
-        special = [sc for sc in scenarios if self.H2_SCENARIOS[sc].requires_restart]
+        normal = [sc for sc in scenarios if sc not in self._H2_RESTART_SCENARIOS]
+        special = [sc for sc in scenarios if sc in self._H2_RESTART_SCENARIOS]
 
         use_tls = self.protocol == "h2-tls"
         scheme = "https" if use_tls else "http"
@@ -1196,7 +1436,7 @@ class BenchmarkRunner:
             print(f">>> Warm-up (h2load): {server} / {scenario_name}")
             try:
                 subprocess.run(
-                    cmd, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+                    cmd, stdout=self._discard_sink(), stderr=subprocess.STDOUT,
                     timeout=self._h2load_process_timeout,
                 )
             except subprocess.TimeoutExpired:
@@ -1210,8 +1450,10 @@ class BenchmarkRunner:
         # Take `self.repeat` samples and keep the median-throughput one (by succeeded
         # request count), preferring non-crashed samples. Each sample carries its own
         # crash-retry fallback.
+        self._reset_peak_rss(server)
         samples: List[Tuple[int, str, bool]] = []
         for sample in range(self.repeat):
+            self._maybe_drop_caches(scenario_name)
             recording = self._start_perf_profile(server, scenario_name, sample)
             try:
                 sample_output, sample_crashed = self._acquire_h2load_output(cmd, conns)
@@ -1443,9 +1685,8 @@ class BenchmarkRunner:
         h2_meta = self.H2_SCENARIOS.get(scenario)
         if not h2_meta:
             return args
-        static_dir = self.script_dir / "static"
-        if h2_meta.requires_static and static_dir.is_dir():
-            args += ["--static", str(static_dir)]
+        if h2_meta.requires_static:
+            args += self._resource_server_args()[0]
         if scenario == "routing":
             args += ["--routes", "1000"]
         return args
@@ -1460,26 +1701,24 @@ class BenchmarkRunner:
             "duration_seconds": None,
         }
         non2xx = 0
-        for line in output.splitlines():
-            line = line.strip()
-            if line.startswith("Non-2xx"):
+        for match in _WRK_SUMMARY_RE.finditer(output):
+            kind = match.lastgroup
+            if kind == "non2xx":
                 try:
-                    non2xx = int(line.split(":", 1)[1])
+                    non2xx = int(match.group("non2xx").split(":", 1)[1])
                 except Exception:
                     non2xx = 1
-            elif "requests in" in line:
-                match = re.search(r"(\d+)\s+requests\s+in\s+([0-9]*\.?[0-9]+)s", line)
-                if match is not None:
-                    values["total_requests"] = int(match.group(1))
-                    values["duration_seconds"] = float(match.group(2))
-            elif line.startswith("Requests/sec"):
-                values["rps"] = line.split(":", 1)[1].strip()
-            elif line.startswith("Latency") and values["latency"] == "-":
-                parts = line.split()
-                if len(parts) >= 2:
-                    values["latency"] = parts[1]
-            elif line.startswith("Transfer/sec"):
-                values["transfer"] = line.split(":", 1)[1].strip()
+            elif kind == "duration":
+                values["total_requests"] = int(match.group("requests"))
+                values["duration_seconds"] = float(match.group("duration"))
+            elif kind == "rps":
+                values["rps"] = match.group("rps")
+            elif kind == "latency":
+                # Only the first 'Latency' line (thread stats average) is relevant.
+                if values["latency"] == "-":
+                    values["latency"] = match.group("latency")
+            elif kind == "transfer":
+                values["transfer"] = match.group("transfer")
         values["non2xx"] = non2xx
         return values
 
@@ -1555,6 +1794,11 @@ class BenchmarkRunner:
     ) -> None:
         key = (server, scenario)
         self.results_rps[key] = rps
+        rps_numeric = self._parse_float(rps)
+        if rps_numeric is None:
+            self._rps_numeric.pop(key, None)
+        else:
+            self._rps_numeric[key] = rps_numeric
         self.results_rps_raw[key] = rps if rps_raw is None else rps_raw
         self.results_latency[key] = latency
         self.results_latency_raw[key] = latency if latency_raw is None else latency_raw
@@ -1640,45 +1884,43 @@ class BenchmarkRunner:
     def _append_result_block(
         self, server: str, scenario: str, output: str, error: bool
     ) -> None:
-        with self.result_file.open("a", encoding="utf-8") as fp:
-            fp.write(f"=== {server} / {scenario}{' (ERROR)' if error else ''} ===\n")
-            fp.write(output)
-            fp.write("\n\n")
+        fp = self._result_stream()
+        fp.write(f"=== {server} / {scenario}{' (ERROR)' if error else ''} ===\n")
+        fp.write(output)
+        fp.write("\n\n")
+        fp.flush()
 
     # ---------------------------- Results output ---------------------------- #
 
+    def _result_stream(self) -> TextIO:
+        if self._result_fp is None:
+            raise BenchmarkError("Result file is only writable while run() is in progress")
+        return self._result_fp
+
     def _write_result_header(self) -> None:
-        sys_info = subprocess.run(
-            ["uname", "-a"], capture_output=True, text=True
-        ).stdout.strip()
-        cpu_info = ""
-        cpuinfo = Path("/proc/cpuinfo")
-        if cpuinfo.is_file():
-            for line in cpuinfo.read_text().splitlines():
-                if line.startswith("model name"):
-                    cpu_info = line.split(":", 1)[1].strip()
-                    break
+        sys_info = _system_info()
+        cpu_info = _cpu_model_name()
         tool = "h2load" if self.protocol in ("h2c", "h2-tls") else "wrk"
-        with self.result_file.open("w", encoding="utf-8") as fp:
-            fp.write("HTTP Server Benchmark Results\n")
-            fp.write("==============================\n")
-            fp.write(f"Date: {self.run_datetime}\n")
-            fp.write(f"Protocol: {self.protocol}\n")
-            fp.write(f"Tool: {tool}\n")
-            fp.write(f"Threads: {self.threads}\n")
-            if self.repeat > 1:
-                fp.write(f"Samples: median of {self.repeat}\n")
-            fp.write(f"CPU pinning: {'on' if self._cpu_pin_enabled else 'off'} "
-                     f"({self.cpu_count} logical CPUs)\n")
-            fp.write(f"Connections: {self.connections}\n")
-            fp.write(f"Duration: {self.duration}\n")
-            if self.protocol in ("h2c", "h2-tls"):
-                fp.write(f"H2 Streams/conn: {self.h2_streams}\n")
-            fp.write(f"wrk timeout: {self.wrk_timeout}\n")
-            fp.write(f"System: {sys_info}\n")
-            if cpu_info:
-                fp.write(f"CPU: {cpu_info}\n")
-            fp.write("\n")
+        fp = self._result_stream()
+        fp.write("HTTP Server Benchmark Results\n")
+        fp.write("==============================\n")
+        fp.write(f"Date: {self.run_datetime}\n")
+        fp.write(f"Protocol: {self.protocol}\n")
+        fp.write(f"Tool: {tool}\n")
+        fp.write(f"Threads: {self.threads}\n")
+        if self.repeat > 1:
+            fp.write(f"Samples: median of {self.repeat}\n")
+        fp.write(f"CPU pinning: {'on' if self._cpu_pin_enabled else 'off'} "
+                 f"({self.cpu_count} logical CPUs)\n")
+        fp.write(f"Connections: {self.connections}\n")
+        fp.write(f"Duration: {self.duration}\n")
+        if self.protocol in ("h2c", "h2-tls"):
+            fp.write(f"H2 Streams/conn: {self.h2_streams}\n")
+        fp.write(f"wrk timeout: {self.wrk_timeout}\n")
+        fp.write(f"System: {sys_info}\n")
+        if cpu_info:
+            fp.write(f"CPU: {cpu_info}\n")
+        fp.write("\n")
 
     def _print_results_table(self) -> None:
         if not self.results_rps:
@@ -1716,28 +1958,28 @@ class BenchmarkRunner:
         # For wrk (http1) some scenarios scale the load-generator thread count (e.g.
         # 'files' via wrk_thread_multiplier); h2load always uses self.threads.
         is_http1 = self.protocol == "http1"
-        with self.result_file.open("a", encoding="utf-8") as fp:
-            fp.write("\n=== SUMMARY TABLE ===\n\n")
-            header = ["Scenario", "Threads", *self.servers_to_test, "Winner"]
-            fp.write(" | ".join(f"{h:<14}" for h in header) + "\n")
-            sep = (
-                "------------|--------|"
-                + "".join("----------------|" for _ in self.servers_to_test)
-                + "--------"
+        fp = self._result_stream()
+        fp.write("\n=== SUMMARY TABLE ===\n\n")
+        header = ["Scenario", "Threads", *self.servers_to_test, "Winner"]
+        fp.write(" | ".join(f"{h:<14}" for h in header) + "\n")
+        sep = (
+            "------------|--------|"
+            + "".join("----------------|" for _ in self.servers_to_test)
+            + "--------"
+        )
+        fp.write(sep + "\n")
+        for scenario in self.scenarios_to_test:
+            scen_meta = self.SCENARIOS.get(scenario) if is_http1 else None
+            thread_display = str(
+                self._wrk_threads_for(scen_meta) if scen_meta else self.threads
             )
-            fp.write(sep + "\n")
-            for scenario in self.scenarios_to_test:
-                scen_meta = self.SCENARIOS.get(scenario) if is_http1 else None
-                thread_display = str(
-                    self._wrk_threads_for(scen_meta) if scen_meta else self.threads
-                )
-                row = [f"{scenario:<12}", f"{thread_display:<7}"]
-                best_server = self._best_server_for_scenario(scenario)
-                for server in self.servers_to_test:
-                    val = self.results_rps.get((server, scenario), "-")
-                    row.append(f"{format_rps(val):<14}")
-                row.append(best_server or "-")
-                fp.write(" | ".join(row) + "\n")
+            row = [f"{scenario:<12}", f"{thread_display:<7}"]
+            best_server = self._best_server_for_scenario(scenario)
+            for server in self.servers_to_test:
+                val = self.results_rps.get((server, scenario), "-")
+                row.append(f"{format_rps(val):<14}")
+            row.append(best_server or "-")
+            fp.write(" | ".join(row) + "\n")
 
     def _write_json_summary(self) -> None:
         """Write a machine-readable JSON summary for CI publishing.
@@ -1748,6 +1990,7 @@ class BenchmarkRunner:
         if not self.results_rps:
             return
 
+        hwm_scope = "scenario" if self._peak_rss_per_scenario else "process"
         summary = {
             "protocol": self.protocol,
             "tool": "h2load" if self.protocol in ("h2c", "h2-tls") else "wrk",
@@ -1831,6 +2074,7 @@ class BenchmarkRunner:
                         "rss_mb": self._kb_to_mb(mem.rss_kb),
                         "peak_mb": self._kb_to_mb(mem.peak_kb),
                         "vmhwm_mb": self._kb_to_mb(mem.hwm_kb),
+                        "vmhwm_scope": hwm_scope,
                         "vmsize_mb": self._kb_to_mb(mem.vm_size_kb),
                         "swap_mb": self._kb_to_mb(mem.vm_swap_kb),
                         "threads": mem.threads,
@@ -1841,7 +2085,7 @@ class BenchmarkRunner:
         with json_path.open("w", encoding="utf-8") as jf:
             json.dump(summary, jf, indent=2)
 
-        self._write_badge_summary(summary)
+        self._write_badge_summary()
 
     @staticmethod
     def _kb_to_mb(kb: Optional[int]) -> Optional[float]:
@@ -1849,20 +2093,12 @@ class BenchmarkRunner:
             return None
         return round(kb / 1024.0, 3)
 
-    def _write_badge_summary(self, summary: Dict[str, Any]) -> None:
-        results = summary.get("results", {})
-        best_value = 0.0
-        best_scenario = None
-        for scenario, data in results.items():
-            aeronet_val = data.get("rps", {}).get("aeronet")
-            numeric = self._parse_float(aeronet_val)
-            if numeric is None:
-                continue
-            if numeric > best_value:
-                best_value = numeric
-                best_scenario = scenario
-
-        if best_scenario is None or best_value <= 0:
+    def _write_badge_summary(self) -> None:
+        best_value = max(
+            (self._rps_numeric.get(("aeronet", scenario), 0.0) for scenario in self.scenarios_to_test),
+            default=0.0,
+        )
+        if best_value <= 0:
             return
 
         badge_payload = {
@@ -1883,7 +2119,7 @@ class BenchmarkRunner:
         if value is None:
             return None
         try:
-            return float(str(value).replace(",", ""))
+            return float(str(value).translate(_COMMA_TABLE))
         except ValueError:
             return None
 
@@ -1897,20 +2133,18 @@ class BenchmarkRunner:
 
     @staticmethod
     def _badge_color(value: float) -> str:
-        if value >= 200_000:
-            return "brightgreen"
-        if value >= 100_000:
-            return "green"
-        if value >= 50_000:
-            return "yellowgreen"
-        if value >= 10_000:
-            return "yellow"
-        return "lightgrey"
-
-    def _print_memory_table(self) -> None:
-        rows = self._memory_summary_rows()
+        return _BADGE_COLORS[bisect.bisect_right(_BADGE_THRESHOLDS, value)]
+
+    def _hwm_column(self) -> Tuple[str, str]:
+        """(column name, note) describing what the VmHWM column covers in this run."""
+        if self._peak_rss_per_scenario:
+            return "ScenHWM", "ScenHWM: peak RSS (VmHWM) of the scenario, reset before it ran"
+        return "VMHWM", "VMHWM: peak RSS (VmHWM) since the server process started"
+
+    def _print_memory_table(self, rows: List[Tuple[str, ...]]) -> None:
         if not rows:
             return
+        hwm_name, hwm_note = self._hwm_column()
         # Boxed memory table similar to other summary boxes (threads removed)
         scenario_w = 12
         server_w = 12
@@ -1920,7 +2154,7 @@ class BenchmarkRunner:
             ("Server", server_w),
             ("RSS", mem_w),
             ("Peak", mem_w),
-            ("VMHWM", mem_w),
+            (hwm_name, mem_w),
             ("VMSize", mem_w),
             ("Swap", mem_w),
         ]
@@ -1929,206 +2163,274 @@ class BenchmarkRunner:
         header_row = " │ ".join(header_cells)
         interior = len(header_row) + 2  # padding inside borders
         border = "═" * interior
-        print("╔" + border + "╗")
+        out: List[str] = ["╔" + border + "╗"]
         title = "MEMORY USAGE SUMMARY"
         subtitle = "(values from /proc/<pid>/status)"
-        for text in (title, subtitle):
+        for text in (title, subtitle, hwm_note):
             left = (interior - len(text)) // 2
             right = interior - len(text) - left
-            print(f"║{' ' * left}{text}{' ' * right}║")
-        print("╠" + border + "╣")
-        print(f"║ {header_row} ║")
-        print("╠" + border + "╣")
-        for scenario, server, stats in rows:
-            cells = [
-                f"{scenario:<{scenario_w}}",
-                f"{server:<{server_w}}",
-                f"{self._format_mem_mb(stats.rss_kb):>{mem_w}}",
-                f"{self._format_mem_mb(stats.peak_kb):>{mem_w}}",
-                f"{self._format_mem_mb(stats.hwm_kb):>{mem_w}}",
-                f"{self._format_mem_mb(stats.vm_size_kb):>{mem_w}}",
-                f"{self._format_mem_mb(stats.vm_swap_kb):>{mem_w}}",
-            ]
+            out.append(f"║{' ' * left}{text}{' ' * right}║")
+        out.append("╠" + border + "╣")
+        out.append(f"║ {header_row} ║")
+        out.append("╠" + border + "╣")
+        # Width format specs parsed once, not per cell
+        scen_fmt = f"{{:<{scenario_w}}}".format
+        srv_fmt = f"{{:<{server_w}}}".format
+        mem_fmt = f"{{:>{mem_w}}}".format
+        for scenario, server, *mem_values in rows:
+            cells = [scen_fmt(scenario), srv_fmt(server), *map(mem_fmt, mem_values)]
             row = " │ ".join(cells)
-            print(f"║ {row} ║")
-        print("╚" + border + "╝")
+            out.append(f"║ {row} ║")
+        out.append("╚" + border + "╝")
+        sys.stdout.write("\n".join(out) + "\n")
 
-    def _write_memory_summary_table(self) -> None:
-        rows = self._memory_summary_rows()
+    def _write_memory_summary_table(self, rows: List[Tuple[str, ...]]) -> None:
         if not rows:
             return
-        with self.result_file.open("a", encoding="utf-8") as fp:
-            fp.write("\n=== MEMORY USAGE SUMMARY ===\n\n")
-            fp.write(
-                "Scenario       | Server       | RSS       | Peak      | VMHWM     | VMSize    | Swap      \n"
-            )
-            fp.write(
-                "--------------|--------------|-----------|-----------|-----------|-----------|-----------\n"
+        hwm_name, hwm_note = self._hwm_column()
+        chunks = [
+            "\n=== MEMORY USAGE SUMMARY ===\n\n",
+            f"{hwm_note}\n\n",
+            "Scenario       | Server       | RSS       | Peak      "
+            f"| {hwm_name:<10}| VMSize    | Swap      \n",
+            "--------------|--------------|-----------|-----------|-----------|-----------|-----------\n",
+        ]
+        chunks.extend(
+            f"{scenario:<14}| {server:<12}| "
+            + " | ".join(f"{value:>9}" for value in mem_values)
+            + "\n"
+            for scenario, server, *mem_values in rows
+        )
+        self._result_stream().write("".join(chunks))
+
+    def _render_memory_rows(self) -> List[Tuple[str, ...]]:
+        """Format the memory summary once for both the console and the result file.
+
+        Each row is ``(scenario, server, rss, peak, vmhwm, vmsize, swap)`` with the
+        memory values already rendered by :meth:`_format_mem_mb`."""
+        return [
+            (
+                scenario,
+                server,
+                self._format_mem_mb(stats.rss_kb),
+                self._format_mem_mb(stats.peak_kb),
+                self._format_mem_mb(stats.hwm_kb),
+                self._format_mem_mb(stats.vm_size_kb),
+                self._format_mem_mb(stats.vm_swap_kb),
             )
-            for scenario, server, stats in rows:
-                fp.write(
-                    f"{scenario:<14}| {server:<12}| {self._format_mem_mb(stats.rss_kb):>9} | {self._format_mem_mb(stats.peak_kb):>9} | "
-                    f"{self._format_mem_mb(stats.hwm_kb):>9} | {self._format_mem_mb(stats.vm_size_kb):>9} | {self._format_mem_mb(stats.vm_swap_kb):>9}\n"
-                )
+            for scenario, server, stats in self._memory_summary_rows()
+        ]
 
     def _memory_summary_rows(self) -> List[Tuple[str, str, MemoryStats]]:
-        rows: List[Tuple[str, str, MemoryStats]] = []
-        for scenario in self.scenarios_to_test:
-            for server in self.servers_to_test:
-                stats = self.memory_usage.get((server, scenario))
-                if stats:
-                    rows.append((scenario, server, stats))
+        # One pass over the recorded snapshots, ordered like the scenario x server loops.
+        scenario_order = {scenario: i for i, scenario in enumerate(self.scenarios_to_test)}
+        server_order = {server: i for i, server in enumerate(self.servers_to_test)}
+        rows = [
+            (scenario, server, stats)
+            for (server, scenario), stats in self.memory_usage.items()
+            if stats and scenario in scenario_order and server in server_order
+        ]
+        rows.sort(key=lambda row: (scenario_order[row[0]], server_order[row[1]]))
         return rows
 
     def _record_memory_usage(self, server: str, scenario: str) -> None:
+        """Snapshot the server's memory once the measured run is over.
+
+        No sampling during the run is needed: VmHWM and VmPeak are high-water marks
+        maintained by the kernel, so the peaks reached under load are still visible in a
+        post-run /proc/<pid>/status read (/proc/<pid>/statm only has current values)."""
         handle = self.server_processes.get(server)
         if not handle:
             return
-        stats = self._read_memory_stats(handle.popen.pid)
+        stats = self._read_memory_stats(handle.popen.pid, server in self.MULTI_PROC_SERVERS)
         if stats:
             self.memory_usage[(server, scenario)] = stats
 
-    def _read_memory_stats(self, pid: int) -> Optional[MemoryStats]:
-        # Aggregate stats for the process and any child/worker processes it may have
-        # spawned (e.g., Python servers using worker processes). We scan /proc to
-        # find descendant PIDs (by PPid) and sum relevant Vm* values. This gives a
+    def _read_memory_stats(self, pid: int, with_children: bool = True) -> Optional[MemoryStats]:
+        # Aggregate stats for the process and, with_children, any child/worker processes
+        # it may have spawned (e.g., Python servers using worker processes). Descendant
+        # PIDs come from _process_tree and their Vm* values are summed. This gives a
         # more realistic memory footprint for multi-process servers.
-        proc_root = Path(f"/proc/{pid}/status")
-        if not proc_root.is_file():
+        root_status = _read_proc_file(f"/proc/{pid}/status")
+        if root_status is None:
             return None
 
-        # Build parent map: pid -> ppid for all numeric /proc entries
-        ppid_map = {}
-        for entry in Path("/proc").iterdir():
-            if not entry.name.isdigit():
+        statuses: List[Optional[bytes]] = [root_status]
+        if with_children:
+            paths = [f"/proc/{p}/status" for p in sorted(self._process_tree(pid)) if p != pid]
+            if len(paths) > self._PARALLEL_STATUS_READS:
+                # Large worker trees: read the status files concurrently (os.read releases the GIL)
+                with ThreadPoolExecutor(max_workers=self._PARALLEL_STATUS_READS) as pool:
+                    statuses.extend(pool.map(_read_proc_file, paths))
+            else:
+                statuses.extend(map(_read_proc_file, paths))
+
+        totals: Dict[str, int] = {}
+        # For each discovered PID, sum the numeric fields of its /proc/<pid>/status
+        for data in statuses:
+            if data is None:
                 continue
+            for key, value in _STATUS_FIELDS_RE.findall(data):
+                field = _STATUS_FIELD_MAP[key]
+                totals[field] = totals.get(field, 0) + int(value)
+        return MemoryStats(**totals)
+
+    def _process_tree(self, pid: int) -> Set[int]:
+        """``pid`` and all of its descendant PIDs.
+
+        Walks /proc/<pid>/task/<tid>/children, which the kernel keeps per thread, so
+        only the server's own tree is read instead of every process on the host. No
+        status file is touched here: callers read each descendant's status once."""
+        if not os.path.exists(f"/proc/{pid}/task/{pid}/children"):
+            # Kernel built without CONFIG_PROC_CHILDREN
+            return self._process_tree_from_ppid(pid)
+        to_visit = [pid]
+        descendants: Set[int] = set()
+        while to_visit:
+            cur = to_visit.pop()
+            if cur in descendants:
+                continue
+            descendants.add(cur)
             try:
-                text = entry.joinpath("status").read_text()
-            except Exception:
+                tids = os.listdir(f"/proc/{cur}/task")
+            except OSError:
                 continue
-            # quick parse for Pid and PPid
-            p = None
-            pp = None
-            for line in text.splitlines():
-                if line.startswith("Pid:"):
-                    p = int(line.split(":", 1)[1].strip())
-                elif line.startswith("PPid:"):
-                    pp = int(line.split(":", 1)[1].strip())
-                if p is not None and pp is not None:
-                    break
-            if p is not None and pp is not None:
-                ppid_map[p] = pp
+            # children are attached to the thread that forked them, not only the leader
+            for tid in tids:
+                data = _read_proc_file(f"/proc/{cur}/task/{tid}/children")
+                if data:
+                    to_visit.extend(map(int, data.split()))
+        return descendants
+
+    def _process_tree_from_ppid(self, pid: int) -> Set[int]:
+        """Fallback for :meth:`_process_tree` scanning the PPid of every process."""
+        children_of: Dict[int, List[int]] = {}
+        for child_pid, parent_pid in self._build_ppid_map().items():
+            children_of.setdefault(parent_pid, []).append(child_pid)
 
         # collect descendants of pid (including pid)
         to_visit = [pid]
-        descendants = set()
+        descendants: Set[int] = set()
         while to_visit:
             cur = to_visit.pop()
-            if cur in descendants:
-                continue
             descendants.add(cur)
-            for child_pid, parent_pid in ppid_map.items():
-                if parent_pid == cur and child_pid not in descendants:
-                    to_visit.append(child_pid)
-
-        agg = MemoryStats()
-        # For each discovered PID, read its /proc/<pid>/status and sum numeric fields
-        for p in sorted(descendants):
-            status_path = Path(f"/proc/{p}/status")
-            if not status_path.is_file():
+            to_visit.extend(c for c in children_of.get(cur, ()) if c not in descendants)
+        return descendants
+
+    def _build_ppid_map(self) -> Dict[int, int]:
+        """pid -> ppid for every process, reused for up to one second.
+
+        Only used when the kernel lacks task children files; back-to-back tree lookups
+        then share one full /proc scan instead of rescanning each time."""
+        now = time.monotonic()
+        timestamp, cached = self._ppid_map_cache
+        if now - timestamp < 1.0:
+            return cached
+        ppid_map: Dict[int, int] = {}
+        with os.scandir("/proc") as entries:
+            names = [entry.name for entry in entries if entry.name.isdigit()]
+        for name in names:
+            path = f"/proc/{name}/status"
+            data = _read_proc_head(path)
+            if data is None:
                 continue
-            for line in status_path.read_text().splitlines():
-                key, _, value = line.partition(":")
-                token = value.strip()
-                if key == "VmRSS":
-                    v = self._parse_kb(token)
-                    if v is not None:
-                        agg.rss_kb = (agg.rss_kb or 0) + v
-                elif key == "VmPeak":
-                    v = self._parse_kb(token)
-                    if v is not None:
-                        agg.peak_kb = (agg.peak_kb or 0) + v
-                elif key == "VmHWM":
-                    v = self._parse_kb(token)
-                    if v is not None:
-                        agg.hwm_kb = (agg.hwm_kb or 0) + v
-                elif key == "VmSize":
-                    v = self._parse_kb(token)
-                    if v is not None:
-                        agg.vm_size_kb = (agg.vm_size_kb or 0) + v
-                elif key == "VmSwap":
-                    v = self._parse_kb(token)
-                    if v is not None:
-                        agg.vm_swap_kb = (agg.vm_swap_kb or 0) + v
-                elif key == "Threads":
-                    t = self._parse_int(token)
-                    if t is not None:
-                        agg.threads = (agg.threads or 0) + t
-        return agg
-
-    @staticmethod
-    def _parse_kb(value: str) -> Optional[int]:
-        if not value:
-            return None
-        parts = value.split()
-        if not parts:
-            return None
-        try:
-            return int(parts[0])
-        except ValueError:
-            return None
-
-    @staticmethod
-    def _parse_int(value: str) -> Optional[int]:
-        if not value:
-            return None
-        try:
-            return int(value.split()[0])
-        except ValueError:
-            return None
+            ppid_match = _PPID_RE.search(data)
+            if ppid_match is None:
+                # unusually long Name line pushed PPid past the head, read it all
+                data = _read_proc_file(path)
+                if data is None:
+                    continue
+                ppid_match = _PPID_RE.search(data)
+            pid_match = _PID_RE.search(data)
+            if pid_match and ppid_match:
+                ppid_map[int(pid_match[1])] = int(ppid_match[1])
+        self._ppid_map_cache = (now, ppid_map)
+        return ppid_map
+
+    def _reset_peak_rss(self, server: str) -> None:
+        """Reset the peak RSS (VmHWM) of the server's process tree before a measurement.
+
+        Servers run several scenarios per instance, so without a reset VmHWM would be the
+        highest RSS since the server started rather than this scenario's peak. Writing
+        '5' to /proc/<pid>/clear_refs (Linux >= 4.0) resets it; the post-run
+        _record_memory_usage snapshot then reports the scenario's own peak without a
+        background sampler. VmPeak (virtual size) cannot be reset and stays cumulative.
+
+        This differs from result files predating the reset, where VmHWM was the peak over
+        the server's lifetime; the memory tables and JSON summary label the scope."""
+        handle = self.server_processes.get(server)
+        if not handle:
+            return
+        root = handle.popen.pid
+        pids = self._process_tree(root) if server in self.MULTI_PROC_SERVERS else (root,)
+        for pid in pids:
+            try:
+                fd = os.open(f"/proc/{pid}/clear_refs", os.O_WRONLY | os.O_CLOEXEC)
+            except OSError:
+                self._peak_rss_per_scenario = False
+                continue
+            try:
+                os.write(fd, b"5")
+            except OSError:
+                self._peak_rss_per_scenario = False
+            finally:
+                os.close(fd)
 
     @staticmethod
     def _format_mem_mb(kb: Optional[int]) -> str:
         if kb is None:
             return "-"
-        return f"{kb / 1024:.1f}MB"
+        return f"{kb * _KB_TO_MB:.1f}MB"
 
     @staticmethod
     def _format_count(value: Optional[int]) -> str:
         return str(value) if value is not None else "-"
 
     def _best_server_for_scenario(self, scenario: str) -> str:
-        best_name = ""
-        best_val = 0
-        for server in self.servers_to_test:
-            val = self.results_rps.get((server, scenario))
-            if val and val != "-":
-                try:
-                    numeric = float(val)
-                except ValueError:
-                    continue
-                if numeric > best_val:
-                    best_val = numeric
-                    best_name = server
-        return best_name
+        # max() keeps the first server on ties, matching the server order.
+        best_val, best_name = max(
+            (
+                (self._rps_numeric.get((server, scenario), 0.0), server)
+                for server in self.servers_to_test
+            ),
+            key=itemgetter(0),
+            default=(0.0, ""),
+        )
+        return best_name if best_val > 0 else ""
 
     # ----------------------------- Utilities -------------------------------- #
 
     def _scenario_server_args(self, server: str, scenario: str) -> List[str]:
         args: List[str] = []
         meta = self.SCENARIOS[scenario]
-        static_dir = self.script_dir / "static"
-        certs_dir = self.script_dir / "certs"
-        if meta.requires_static and static_dir.is_dir():
-            args += ["--static", str(static_dir)]
+        static_args, tls_args = self._resource_server_args()
+        if meta.requires_static:
+            args += static_args
         if scenario == "routing":
             args += ["--routes", "1000"]
-        if scenario == "tls" and server == "aeronet" and certs_dir.is_dir():
+        if scenario == "tls" and server == "aeronet":
+            args += tls_args
+        return args
+
+    def _resource_server_args(self) -> Tuple[Tuple[str, ...], Tuple[str, ...]]:
+        """Server args pointing at the static files dir and the TLS cert/key, empty when
+        missing.
+
+        Checked once, on first use: resources are prepared at the start of run(), before
+        any server starts, and do not change during the run."""
+        if self._resource_args is None:
+            static_dir = self.script_dir / "static"
+            certs_dir = self.script_dir / "certs"
             cert = certs_dir / "server.crt"
             key = certs_dir / "server.key"
+            static_args: Tuple[str, ...] = ()
+            tls_args: Tuple[str, ...] = ()
+            if static_dir.is_dir():
+                static_args = ("--static", str(static_dir))
             if cert.is_file() and key.is_file():
-                args += ["--tls", "--cert", str(cert), "--key", str(key)]
-        return args
+                tls_args = ("--tls", "--cert", str(cert), "--key", str(key))
+            self._resource_args = (static_args, tls_args)
+        return self._resource_args
 
     def _ensure_test_static_files(self) -> None:
         static_dir = self.script_dir / "static"
@@ -2144,15 +2446,33 @@ class BenchmarkRunner:
             print(
                 f"Creating static test file: {file_name} ({size_bytes // (1024 * 1024)} MB)"
             )
-            fallocate = shutil.which("fallocate")
-            if fallocate:
-                subprocess.run(
-                    [fallocate, "-l", str(size_bytes), str(target)], check=True
-                )
-            else:
-                with target.open("wb") as fp:
-                    fp.seek(size_bytes - 1)
-                    fp.write(b"\0")
+            # posix_fallocate reserves the blocks in-process (no fallocate(1) fork+exec).
+            fd = os.open(target, os.O_WRONLY | os.O_CREAT | os.O_CLOEXEC, 0o644)
+            try:
+                try:
+                    os.posix_fallocate(fd, 0, size_bytes)
+                except OSError:
+                    # Filesystem without fallocate support: fall back to a sparse file,
+                    # extended in one syscall without writing any data block.
+                    os.ftruncate(fd, size_bytes)
+            finally:
+                os.close(fd)
+
+    def _maybe_drop_caches(self, scenario: str) -> None:
+        """Flush dirty pages and drop the page cache right before each measured sample of
+        the disk-backed 'files' scenario, for wrk and h2load alike.
+
+        Without this the first server to run 'files' reads from disk while the following
+        ones are served from RAM, which inflates run-to-run variance. Writing
+        /proc/sys/vm/drop_caches requires root; on failure the feature is disabled."""
+        if not self._drop_caches_enabled or scenario != "files":
+            return
+        subprocess.run(["sync"], check=False)
+        try:
+            Path("/proc/sys/vm/drop_caches").write_text("3\n", encoding="ascii")
+        except OSError as exc:
+            print(f"WARNING: cannot drop page cache ({exc}); disabling --drop-caches")
+            self._drop_caches_enabled = False
 
     def _ensure_wrk_available(self) -> None:
         if not shutil.which("wrk"):
@@ -2163,22 +2483,70 @@ class BenchmarkRunner:
             sock.settimeout(0.1)
             return sock.connect_ex(("127.0.0.1", port)) == 0
 
-    def _wait_for_server(self, port: int, scheme: str, insecure: bool) -> bool:
-        url = f"{scheme}://127.0.0.1:{port}/status"
-        context = ssl.create_default_context()
-        if insecure:
-            context.check_hostname = False
-            context.verify_mode = ssl.CERT_NONE
-        for _ in range(50):
-            try:
-                req = urllib.request.Request(url)
-                with urllib.request.urlopen(
-                    req, timeout=0.5, context=context if scheme == "https" else None
-                ):
-                    return True
-            except Exception:
-                time.sleep(0.2)
-        return False
+    @staticmethod
+    def _port_accepting(port: int, timeout: float) -> bool:
+        """Non-blocking connect() probe: True once something accepts on ``port``."""
+        with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
+            sock.setblocking(False)
+            err = sock.connect_ex(("127.0.0.1", port))
+            if err == errno.EINPROGRESS:
+                _, writable, _ = select.select([], [sock], [], timeout)
+                if not writable:
+                    return False
+                err = sock.getsockopt(socket.SOL_SOCKET, socket.SO_ERROR)
+            return err == 0
+
+    def _probe_ssl_context(self, insecure: bool) -> ssl.SSLContext:
+        """Client SSL context for readiness probes, created once per verification mode
+        and shared by every HTTPS probe of the run."""
+        context = self._probe_ssl_contexts.get(insecure)
+        if context is None:
+            context = ssl.create_default_context()
+            if insecure:
+                context.check_hostname = False
+                context.verify_mode = ssl.CERT_NONE
+            self._probe_ssl_contexts[insecure] = context
+        return context
+
+    def _wait_for_server(
+        self, port: int, scheme: str, insecure: bool, timeout: float = 15.0
+    ) -> bool:
+        """Wait until the server answers ``/status``.
+
+        Poll with a cheap non-blocking connect() using an exponential backoff (2ms up to
+        50ms) so readiness is detected close to the actual bind time, and only issue the
+        HTTP(S) request once the port accepts connections. After that first successful
+        connect the TCP probe is skipped: the HTTP(S) attempt itself reports a closed
+        port. A single HTTP(S) connection object is reused across attempts, so a server
+        that accepts but is not ready yet does not cost a fresh TLS handshake per retry
+        while the connection is kept alive."""
+        if scheme == "https":
+            conn: http.client.HTTPConnection = http.client.HTTPSConnection(
+                "127.0.0.1", port, timeout=0.5, context=self._probe_ssl_context(insecure)
+            )
+        else:
+            conn = http.client.HTTPConnection("127.0.0.1", port, timeout=0.5)
+        deadline = time.monotonic() + timeout
+        delay = 0.002
+        listening = False
+        try:
+            while time.monotonic() < deadline:
+                if listening or self._port_accepting(port, delay):
+                    listening = True
+                    try:
+                        conn.request("GET", "/status")
+                        response = conn.getresponse()
+                        response.read()
+                        if response.status < 400:
+                            return True
+                    except (OSError, http.client.HTTPException):
+                        # Drop the broken socket; the next request() reconnects.
+                        conn.close()
+                time.sleep(delay)
+                delay = min(delay * 2, 0.05)
+            return False
+        finally:
+            conn.close()
 
 
 # ------------------------------ Table printer ------------------------------ #
@@ -2189,14 +2557,48 @@ from bench_utils import PerfProfiler, PerfRecording, TablePrinter, format_rps  #
 # ------------------------------- CLI parsing ------------------------------- #
 
 
+def _env_flag(name: str) -> bool:
+    return os.environ.get(name, "") not in ("", "0", "false", "False")
+
+
+@dataclass(frozen=True)
+class BenchDefaults:
+    """CLI defaults, overridable through BENCH_* environment variables."""
+    threads: int
+    connections: int
+    duration: str
+    warmup: str
+    wrk_timeout: str
+    output: str
+    h2_streams: int
+    repeat: int
+    no_cpu_pin: bool
+    drop_caches: bool
+
+    @classmethod
+    def from_env(cls) -> BenchDefaults:
+        cpu_count = os.cpu_count() or 1
+        threads = int(os.environ.get("BENCH_THREADS") or max(1, cpu_count // 5))
+        env_connections = os.environ.get("BENCH_CONNECTIONS")
+        return cls(
+            threads=threads,
+            connections=int(env_connections) if env_connections else 50 * threads,
+            duration=os.environ.get("BENCH_DURATION", "30s"),
+            warmup=os.environ.get("BENCH_WARMUP", "5s"),
+            wrk_timeout=os.environ.get("BENCH_WRK_TIMEOUT", "10s"),
+            output=os.environ.get("BENCH_OUTPUT", "./results"),
+            h2_streams=int(os.environ.get("BENCH_H2_STREAMS") or 10),
+            repeat=int(os.environ.get("BENCH_REPEAT") or 1),
+            no_cpu_pin=_env_flag("BENCH_NO_CPU_PIN"),
+            drop_caches=_env_flag("BENCH_DROP_CACHES"),
+        )
+
+
+BENCH_DEFAULTS = BenchDefaults.from_env()
+
+
 def parse_args() -> argparse.Namespace:
-    cpu_count = os.cpu_count() or 1
-    default_threads = int(os.environ.get("BENCH_THREADS", max(1, cpu_count // 5)))
-    default_connections = int(os.environ.get("BENCH_CONNECTIONS", 50*default_threads))
-    default_duration = os.environ.get("BENCH_DURATION", "30s")
-    default_warmup = os.environ.get("BENCH_WARMUP", "5s")
-    default_wrk_timeout = os.environ.get("BENCH_WRK_TIMEOUT", "10s")
-    default_output = os.environ.get("BENCH_OUTPUT", "./results")
+    defaults = BENCH_DEFAULTS
     parser = argparse.ArgumentParser(
         description="Run wrk/h2load benchmarks across multiple servers"
     )
@@ -2208,7 +2610,7 @@ def parse_args() -> argparse.Namespace:
         help="Protocol to benchmark: http1 (wrk), h2c (h2load, cleartext), h2-tls (h2load, TLS)",
     )
     parser.add_argument(
-        "--threads", type=int, default=default_threads, help="Number of wrk/h2load threads"
+        "--threads", type=int, default=defaults.threads, help="Number of wrk/h2load threads"
     )
 
     # Low number of connections -> Measure latency more accurately, but may not fully saturate high-performance servers
@@ -2216,28 +2618,28 @@ def parse_args() -> argparse.Namespace:
     parser.add_argument(
         "--connections",
         type=int,
-        default=default_connections,
+        default=defaults.connections,
         help="Number of wrk connections",
     )
     parser.add_argument(
         "--duration",
         type=str,
-        default=default_duration,
+        default=defaults.duration,
         help="Duration per benchmark (e.g. 30s)",
     )
     parser.add_argument(
-        "--warmup", type=str, default=default_warmup, help="Warmup duration (e.g. 5s)"
+        "--warmup", type=str, default=defaults.warmup, help="Warmup duration (e.g. 5s)"
     )
     parser.add_argument(
         "--wrk-timeout",
         type=str,
-        default=default_wrk_timeout,
+        default=defaults.wrk_timeout,
         help="Per-request wrk timeout used both by wrk and timeout-penalty latency adjustment (e.g. 2s)",
     )
     parser.add_argument(
         "--output",
         type=str,
-        default=default_output,
+        default=defaults.output,
         help="Output directory for results",
     )
     parser.add_argument(
@@ -2255,13 +2657,13 @@ def parse_args() -> argparse.Namespace:
     parser.add_argument(
         "--h2-streams",
         type=int,
-        default=int(os.environ.get("BENCH_H2_STREAMS", "10")),
+        default=defaults.h2_streams,
         help="Max concurrent HTTP/2 streams per connection (h2load -m, default: 10)",
     )
     parser.add_argument(
         "--repeat",
         type=int,
-        default=int(os.environ.get("BENCH_REPEAT", "1")),
+        default=defaults.repeat,
         help="Number of measurement samples per (server, scenario); the median-throughput "
         "sample is reported (default: 1). Use >1 (e.g. weekly runs) for steadier numbers "
         "on noisy CI runners at the cost of wall-clock time.",
@@ -2269,11 +2671,19 @@ def parse_args() -> argparse.Namespace:
     parser.add_argument(
         "--no-cpu-pin",
         action="store_true",
-        default=os.environ.get("BENCH_NO_CPU_PIN", "") not in ("", "0", "false", "False"),
+        default=defaults.no_cpu_pin,
         help="Disable pinning the server and load generator (wrk/h2load) to disjoint CPU "
         "cores. Pinning (Linux + taskset, enough cores) reduces load-generator/server "
         "contention; auto-disabled on small boxes (e.g. 2-core CI runners).",
     )
+    parser.add_argument(
+        "--drop-caches",
+        action="store_true",
+        default=defaults.drop_caches,
+        help="Sync and drop the kernel page cache right before each measured sample of the "
+        "'files' scenario (after any warm-up, with wrk and h2load alike), so every server "
+        "is measured from a cold cache (requires root; ignored with a warning otherwise).",
+    )
     parser.add_argument(
         "--profile",
         action="store_true",
@@ -18,6 +18,33 @@ def _read_version():
         return "0.0.0"
 
 
+# Boolean feature options and their defaults: the single list both options and
+# default_options are built from.
+_FEATURE_DEFAULTS = {
+    "with_openssl": False,
+    "with_spdlog": False,
+    "with_br": False,
+    "with_zlib": False,
+    "with_zlibng": True,
+    "with_zstd": False,
+    "with_opentelemetry": False,
+    "with_glaze": False,
+}
+
+# package_info() requires added for each enabled option (zlib / zlib-ng is handled apart).
+_OPTION_CPP_INFO_REQUIRES = (
+    ("with_openssl", ("openssl::openssl",)),
+    ("with_spdlog", ("spdlog::spdlog",)),
+    ("with_zstd", ("zstd::zstd",)),
+    # Protobuf is a direct requirement when OpenTelemetry support is enabled
+    # and some exported CMake targets / generated protos may need it. Ensure
+    # the Conan package_info references the protobuf requirement so Conan
+    # doesn't treat it as unused when creating the package.
+    ("with_opentelemetry", ("opentelemetry-cpp::opentelemetry-cpp", "protobuf::protobuf")),
+    ("with_glaze", ("glaze::glaze",)),
+)
+
+
 class AeronetConan(ConanFile):
     name = "aeronet"
     version = _read_version()
@@ -29,26 +56,12 @@ class AeronetConan(ConanFile):
     options = {
         "shared": [True, False],
         "fPIC": [True, False],
-        "with_openssl": [True, False],
-        "with_spdlog": [True, False],
-        "with_br": [True, False],
-        "with_zlib": [True, False],
-        "with_zlibng": [True, False],
-        "with_zstd": [True, False],
-        "with_opentelemetry": [True, False],
-        "with_glaze": [True, False],
+        **{feature: [True, False] for feature in _FEATURE_DEFAULTS},
     }
     default_options = {
         "shared": False,
         "fPIC": True,
-        "with_openssl": False,
-        "with_spdlog": False,
-        "with_br": False,
-        "with_zlib": False,
-        "with_zlibng": True,
-        "with_zstd": False,
-        "with_opentelemetry": False,
-        "with_glaze": False,
+        **_FEATURE_DEFAULTS,
     }
     exports_sources = (
         "CMakeLists.txt",
@@ -154,23 +167,11 @@ class AeronetConan(ConanFile):
         # Provide a convenient CMake target namespace expectation
         self.cpp_info.set_property("cmake_file_name", "aeronet")
         self.cpp_info.set_property("cmake_target_name", "aeronet::aeronet")
-        if self.options.with_openssl:
-            self.cpp_info.requires.append("openssl::openssl")
-        if self.options.with_spdlog:
-            self.cpp_info.requires.append("spdlog::spdlog")
+        for option, requires in _OPTION_CPP_INFO_REQUIRES:
+            if self.options.get_safe(option):
+                self.cpp_info.requires.extend(requires)
         if self.options.with_zlib:
             if self.options.with_zlibng:
                 self.cpp_info.requires.append("zlib-ng::zlib-ng")
             else:
                 self.cpp_info.requires.append("zlib::zlib")
-        if self.options.with_zstd:
-            self.cpp_info.requires.append("zstd::zstd")
-        if self.options.with_opentelemetry:
-            self.cpp_info.requires.append("opentelemetry-cpp::opentelemetry-cpp")
-            # Protobuf is a direct requirement when OpenTelemetry support is enabled
-            # and some exported CMake targets / generated protos may need it. Ensure
-            # the Conan package_info references the protobuf requirement so Conan
-            # doesn't treat it as unused when creating the package.
-            self.cpp_info.requires.append("protobuf::protobuf")
-        if self.options.with_glaze:
-            self.cpp_info.requires.append("glaze::glaze")
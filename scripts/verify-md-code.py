@@ -3,6 +3,11 @@
 
 import argparse
 import concurrent.futures
+import contextlib
+import fnmatch
+import functools
+import hashlib
+import io
 import json
 import os
 import platform
@@ -13,7 +18,7 @@ import sys
 import tempfile
 from dataclasses import dataclass
 from pathlib import Path
-from typing import List, Optional, Sequence, Tuple
+from typing import Any, Dict, List, Optional, Sequence, Set, Tuple
 from urllib.parse import unquote, urlsplit
 
 
@@ -21,6 +26,9 @@ LANGUAGES = {"c", "cpp", "c++"}
 MARKDOWN_LINK_PATTERN = re.compile(r"(?<![!\\])\[([^]\n]+)\]\(([^)\n]+)\)")
 MARKDOWN_FENCE_PATTERN = re.compile(r"^\s*(`{3,}|~{3,})")
 INLINE_CODE_PATTERN = re.compile(r"(`+).*?\1")
+SANITIZE_FLAG_PATTERN = re.compile(r"-fsanitize=[^\s\"]+")
+FEATURE_FLAG_PATTERN = re.compile(r"^(AERONET_ENABLE_[^:\n]*):BOOL=ON", re.MULTILINE)
+COMPILER_VERSION_SUFFIX_PATTERN = re.compile(r"(\d+)$")
 
 DEPENDENCY_LIBRARY_PATTERNS = [
     # zlib: prefer zlib-ng when available; fallback to classic zlib
@@ -71,6 +79,36 @@ DEPENDENCY_LIBRARY_PATTERNS = [
     ("libopentelemetry_common.so*", "-lopentelemetry_common"),
 ]
 
+# CMake's default per-configuration flags for GCC/Clang, applied when compiling directly.
+BUILD_TYPE_FLAGS = {
+    "debug": ["-g"],
+    "release": ["-O3", "-DNDEBUG"],
+    "relwithdebinfo": ["-O2", "-g", "-DNDEBUG"],
+    "minsizerel": ["-Os", "-DNDEBUG"],
+}
+
+# Warning options kept from the aeronet target: errors, silenced warnings and pass-throughs.
+KEPT_WARNING_OPTION_PREFIXES = ("-Werror", "-Wno-", "-Wfatal-errors", "-Wl,", "-Wa,", "-Wp,")
+
+# Precompiled once and force-included into every batch without module imports. Those
+# batches include the umbrella header anyway; standard headers stay out so that a snippet
+# missing one of its own includes still fails.
+PRECOMPILED_HEADER_NAME = "doc_snippets_pch.hpp"
+PRECOMPILED_HEADER_INCLUDE = "<aeronet/aeronet.hpp>"
+
+# Subdirectory of the aeronet build directory keeping this script's state across runs:
+# the snippets that built successfully and the libraries found for link mode.
+STATE_DIR_NAME = "verify-md-code"
+SNIPPET_MANIFEST_NAME = "snippets.json"
+LIBRARY_INDEX_NAME = "libraries.json"
+
+# Only these files are fingerprinted below include directories.
+HEADER_SUFFIXES = (".h", ".hh", ".hpp", ".hxx", ".h++", ".inc", ".inl", ".ipp", ".tcc", ".tpp")
+
+DEPENDENCY_LIBRARY_NAME_PATTERN = re.compile(
+    "|".join(fnmatch.translate(pattern) for pattern, _ in DEPENDENCY_LIBRARY_PATTERNS)
+)
+
 SYSTEM_LINK_FLAGS = [
     "-lssl",
     "-lcrypto",
@@ -119,9 +157,9 @@ def parse_args() -> argparse.Namespace:
         description=(
             "Validate internal Markdown links and compile/link C/C++ fences to detect "
             "documentation bitrot. "
-            "Snippets are built through CMake/Ninja against the existing aeronet "
-            "build so they automatically inherit include paths, defines, and "
-            "toolchain settings."
+            "Snippets are compiled against the existing aeronet build with the "
+            "compiler, include paths, defines, and options it was configured with, "
+            "either directly or through a generated CMake project (--use-cmake)."
         )
     )
     parser.add_argument(
@@ -141,6 +179,50 @@ def parse_args() -> argparse.Namespace:
         default="build",
         help="Existing aeronet build directory (default: build)",
     )
+    parser.add_argument(
+        "--use-cmake",
+        action="store_true",
+        help=(
+            "Build the snippets through a generated CMake project instead of invoking "
+            "the compiler directly (slower: pays a CMake configure per run)"
+        ),
+    )
+    parser.add_argument(
+        "--syntax-only",
+        action="store_true",
+        help=(
+            "Only check that the snippets compile, without generating code "
+            "(-fsyntax-only; not with --link or --use-cmake)"
+        ),
+    )
+    parser.add_argument(
+        "--no-pch",
+        action="store_true",
+        help=(
+            "Do not precompile <aeronet/aeronet.hpp> for the batches without module "
+            "imports"
+        ),
+    )
+    parser.add_argument(
+        "--no-snippet-cache",
+        action="store_true",
+        help=(
+            "Rebuild every snippet, including those recorded as built with the same "
+            "toolchain, flags, headers and libraries by a previous run"
+        ),
+    )
+    parser.add_argument(
+        "--work-dir",
+        default=os.environ.get("AERONET_DOC_WORK_DIR") or None,
+        metavar="DIR",
+        help=(
+            "Keep the generated sources and snippet project in DIR across runs "
+            "(default: $AERONET_DOC_WORK_DIR, else a temporary directory). Unchanged "
+            "files are not rewritten and the snippet project is only reconfigured when "
+            "its configure command changes, so with --use-cmake only the batches whose "
+            "content changed are rebuilt"
+        ),
+    )
     parser.add_argument(
         "--cmake",
         default=os.environ.get("CMAKE", "cmake"),
@@ -161,7 +243,10 @@ def parse_args() -> argparse.Namespace:
         "--jobs",
         type=int,
         default=None,
-        help="Number of batched snippet targets to build in parallel",
+        help=(
+            "Number of batched snippet targets to build in parallel "
+            "(default: CPU count when compiling directly)"
+        ),
     )
     parser.add_argument(
         "--snippets-per-batch",
@@ -174,13 +259,32 @@ def parse_args() -> argparse.Namespace:
             "(default: 8)"
         ),
     )
+    parser.add_argument(
+        "--module-cache-dir",
+        default=os.environ.get(
+            "AERONET_DOC_CACHE",
+            os.path.join(
+                os.environ.get("XDG_CACHE_HOME") or os.path.expanduser("~/.cache"),
+                "aeronet-doc-verify",
+            ),
+        ),
+        metavar="DIR",
+        help=(
+            "Directory keeping the precompiled std/aeronet modules across runs, "
+            "keyed by toolchain, flags and inputs; empty disables it "
+            "(default: $AERONET_DOC_CACHE or ~/.cache/aeronet-doc-verify)"
+        ),
+    )
     parser.add_argument(
         "files",
         nargs="*",
         default=["README.md", "FEATURES.md"],
         help="Markdown files to scan for code snippets and internal links",
     )
-    return parser.parse_args()
+    args = parser.parse_args()
+    if args.syntax_only and (args.link or args.use_cmake):
+        parser.error("--syntax-only cannot be combined with --link or --use-cmake")
+    return args
 
 
 def positive_int(value: str) -> int:
@@ -208,7 +312,9 @@ def find_internal_link_failures(
                 else:
                     fence = delimiter
                 continue
-            if fence:
+            # Plain substring checks keep the regex engine off the (many) lines that
+            # cannot hold a link or a code span.
+            if fence or "](" not in line:
                 continue
 
             code_spans: List[str] = []
@@ -218,7 +324,9 @@ def find_internal_link_failures(
                 code_spans.append(match.group(0))
                 return marker
 
-            markdown_line = INLINE_CODE_PATTERN.sub(mask_code_span, line)
+            markdown_line = (
+                INLINE_CODE_PATTERN.sub(mask_code_span, line) if "`" in line else line
+            )
             for match in MARKDOWN_LINK_PATTERN.finditer(markdown_line):
                 destination = match.group(2).strip()
                 if destination.startswith("<") and destination.endswith(">"):
@@ -254,22 +362,11 @@ def print_internal_link_failures(failures: Sequence[InternalLinkFailure]) -> Non
 
 
 def dedupe_preserve(items: Sequence[str]) -> List[str]:
-    seen = set()
-    ordered: List[str] = []
-    for item in items:
-        if item in seen:
-            continue
-        seen.add(item)
-        ordered.append(item)
-    return ordered
+    return list(dict.fromkeys(items))
 
 
 def gather_user_include_dirs(user_includes: Sequence[str]) -> List[str]:
-    dirs: List[str] = []
-    for include in user_includes:
-        path = Path(include)
-        dirs.append(str(path.resolve()))
-    return dirs
+    return [os.path.abspath(include) for include in user_includes]
 
 
 def fallback_include_dirs() -> List[str]:
@@ -287,59 +384,55 @@ def fallback_include_dirs() -> List[str]:
         "aeronet/tls/include",
         "aeronet/websocket/include",
     ]
+    cwd = os.getcwd()
     dirs: List[str] = []
     for root in possible_roots:
-        path = Path(root)
-        if path.is_dir():
-            dirs.append(str(path.resolve()))
+        path = os.path.join(cwd, root)
+        if os.path.isdir(path):
+            dirs.append(path)
     return dirs
 
 
 def locate_dependency_include_dirs(build_dir: Path) -> List[str]:
-    include_dirs: List[str] = []
+    """Return existing dependency include directories under build_dir (expected absolute)."""
+    deps_dir = os.path.join(build_dir, "_deps")
     candidates = [
-        build_dir / "_deps" / "brotli-src" / "c" / "include",
-        build_dir / "_deps" / "spdlog-src" / "include",
-        build_dir / "_deps" / "amadeusamc-src" / "include",
-        build_dir / "_deps" / "opentelemetry_cpp-src" / "api" / "include",
-        build_dir / "_deps" / "opentelemetry_cpp-src" / "sdk" / "include",
-        build_dir
-        / "_deps"
-        / "opentelemetry_cpp-src"
-        / "exporters"
-        / "ostream"
-        / "include",
-        build_dir
-        / "_deps"
-        / "opentelemetry_cpp-src"
-        / "exporters"
-        / "otlp"
-        / "include",
-        build_dir / "_deps" / "opentelemetry_cpp-src" / "ext" / "include",
-        build_dir / "generated" / "third_party" / "opentelemetry-proto",
-        build_dir / "_deps" / "zlib-ng-src" / "lib",
-        build_dir / "_deps" / "zstd-src" / "lib",
-        build_dir / "_deps" / "glaze-src" / "include",
+        os.path.join(deps_dir, "brotli-src", "c", "include"),
+        os.path.join(deps_dir, "spdlog-src", "include"),
+        os.path.join(deps_dir, "amadeusamc-src", "include"),
+        os.path.join(deps_dir, "opentelemetry_cpp-src", "api", "include"),
+        os.path.join(deps_dir, "opentelemetry_cpp-src", "sdk", "include"),
+        os.path.join(deps_dir, "opentelemetry_cpp-src", "exporters", "ostream", "include"),
+        os.path.join(deps_dir, "opentelemetry_cpp-src", "exporters", "otlp", "include"),
+        os.path.join(deps_dir, "opentelemetry_cpp-src", "ext", "include"),
+        os.path.join(build_dir, "generated", "third_party", "opentelemetry-proto"),
+        os.path.join(deps_dir, "zlib-ng-src", "lib"),
+        os.path.join(deps_dir, "zstd-src", "lib"),
+        os.path.join(deps_dir, "glaze-src", "include"),
     ]
-    for candidate in candidates:
-        if candidate.is_dir():
-            include_dirs.append(str(candidate.resolve()))
+    include_dirs = [candidate for candidate in candidates if os.path.isdir(candidate)]
 
     # Also scan the _deps directory for any zlib or zlib-ng source/build folders
     # and add common include/lib locations. This helps when FetchContent or
     # packaged zlib-ng places headers in non-standard subfolders.
-    deps_dir = build_dir / "_deps"
-    if deps_dir.is_dir():
-        for entry in deps_dir.iterdir():
-            name = entry.name.lower()
-            if not name.startswith("zlib"):
-                continue
-            # prefer include/, then lib/, then the directory itself
-            for sub in ("include", "lib", ""):
-                candidate = entry / sub if sub else entry
-                if candidate.is_dir():
-                    include_dirs.append(str(candidate.resolve()))
-                    break
+    try:
+        with os.scandir(deps_dir) as entries:
+            zlib_dirs = [
+                entry.path
+                for entry in entries
+                if entry.name.lower().startswith("zlib") and entry.is_dir()
+            ]
+    except OSError:
+        zlib_dirs = []
+    for entry_path in zlib_dirs:
+        # prefer include/, then lib/, then the directory itself
+        for sub in ("include", "lib"):
+            candidate = os.path.join(entry_path, sub)
+            if os.path.isdir(candidate):
+                include_dirs.append(candidate)
+                break
+        else:
+            include_dirs.append(entry_path)
     return include_dirs
 
 
@@ -351,18 +444,46 @@ def read_defines() -> List[str]:
     return [f'-DAERONET_VERSION_STR="{version}"']
 
 
-def detect_sanitizer_flags(build_dir: Path) -> List[str]:
+@functools.lru_cache(maxsize=None)
+def read_cache_text(build_dir: Path) -> str:
+    """Return the content of build_dir/CMakeCache.txt (empty if absent), read once per run."""
     cache_file = build_dir / "CMakeCache.txt"
     if not cache_file.is_file():
+        return ""
+    return cache_file.read_text()
+
+
+@functools.lru_cache(maxsize=None)
+def read_cache_entries(build_dir: Path) -> Dict[str, str]:
+    """Parse CMakeCache.txt into a KEY -> value mapping (the :TYPE suffix is dropped)."""
+    entries: Dict[str, str] = {}
+    for line in read_cache_text(build_dir).splitlines():
+        if line.startswith(("//", "#")):
+            continue
+        key_and_type, sep, value = line.partition("=")
+        key, colon, _ = key_and_type.partition(":")
+        if sep and colon:
+            entries.setdefault(key, value)
+    return entries
+
+
+@functools.lru_cache(maxsize=None)
+def enabled_cmake_features(build_dir: Path) -> Tuple[str, ...]:
+    """Names of the AERONET_ENABLE_* options turned ON in CMakeCache.txt, in cache order."""
+    return tuple(FEATURE_FLAG_PATTERN.findall(read_cache_text(build_dir)))
+
+
+def detect_sanitizer_flags(build_dir: Path) -> List[str]:
+    cache_content = read_cache_text(build_dir)
+    if not cache_content:
         return []
-    cache_content = cache_file.read_text()
     flags: List[str] = []
 
     def append_flag(flag: str) -> None:
         if flag not in flags:
             flags.append(flag)
 
-    if "AERONET_ENABLE_ASAN:BOOL=ON" in cache_content:
+    if "AERONET_ENABLE_ASAN" in enabled_cmake_features(build_dir):
         for flag in [
             "-fsanitize=address",
             "-fsanitize=undefined",
@@ -371,66 +492,68 @@ def detect_sanitizer_flags(build_dir: Path) -> List[str]:
         ]:
             append_flag(flag)
 
-    for match in re.findall(r"-fsanitize=[^\s\"]+", cache_content):
+    for match in SANITIZE_FLAG_PATTERN.findall(cache_content):
         append_flag(match)
 
     return flags
 
 
 def read_cache_entry(build_dir: Path, key: str) -> Optional[str]:
-    cache_file = build_dir / "CMakeCache.txt"
-    if not cache_file.is_file():
-        return None
-    prefix = f"{key}:"
-    for line in cache_file.read_text().splitlines():
-        if not line.startswith(prefix):
-            continue
-        _, value = line.split("=", 1)
-        return value
-    return None
+    return read_cache_entries(build_dir).get(key)
 
 
 MAIN_FUNCTION_PATTERN = re.compile(r"\bint\s+main\s*\(")
 IMPORT_PATTERN = re.compile(r"^\s*import\s+")
+IMPORT_STD_PATTERN = re.compile(r"^\s*import\s+std\s*;")
+IMPORT_AERONET_PATTERN = re.compile(r"^\s*import\s+aeronet\s*;")
+CODE_FENCE_LINE_PATTERN = re.compile(r"^```([^\n]*)", re.MULTILINE)
 INCLUDE_PATTERN = re.compile(r'^\s*#\s*include\s*(<[^>]+>|"[^"]+")')
 
 
-def extract_snippets(source: Path, first_index: int) -> List[Snippet]:
+def read_code_blocks(source: Path) -> List[Tuple[int, List[str]]]:
+    """Return (first body line number, body lines) for each C/C++ fence of source."""
+    text = source.read_text()
     blocks: List[Tuple[int, List[str]]] = []
-    current: List[str] = []
-    in_block = False
+    block_start = -1
     block_start_line = 0
-
-    for line_number, line in enumerate(source.read_text().splitlines(), start=1):
-        if line.startswith("```"):
-            tag = line[3:].strip().lower()
-            if in_block:
-                blocks.append((block_start_line, current))
-                current = []
-                in_block = False
-                continue
-            if tag in LANGUAGES:
-                in_block = True
-                block_start_line = line_number + 1
-            continue
-        if in_block:
-            current.append(line)
-
+    line_number = 1
+    scanned = 0
+
+    # Only fence lines drive the state machine: any fence closes an open block and
+    # only a C/C++ tagged fence opens one.
+    for match in CODE_FENCE_LINE_PATTERN.finditer(text):
+        line_number += text.count("\n", scanned, match.start())
+        scanned = match.start()
+        if block_start >= 0:
+            blocks.append((block_start_line, text[block_start : match.start()].splitlines()))
+            block_start = -1
+        elif match.group(1).strip().lower() in LANGUAGES:
+            block_start = match.end() + 1
+            block_start_line = line_number + 1
+    return blocks
+
+
+def extract_snippets(
+    source: Path, blocks: Sequence[Tuple[int, List[str]]], first_index: int
+) -> List[Snippet]:
     snippets: List[Snippet] = []
     for index, (source_line, lines) in enumerate(blocks, start=first_index):
+        needs_std_module = False
+        needs_aeronet_module = False
+        for line in lines:
+            # Cheap prefilter: only import declarations can require a module.
+            if not IMPORT_PATTERN.match(line):
+                continue
+            needs_std_module |= IMPORT_STD_PATTERN.match(line) is not None
+            needs_aeronet_module |= IMPORT_AERONET_PATTERN.match(line) is not None
         snippets.append(
             Snippet(
                 index=index,
                 source=source,
                 source_line=source_line,
                 lines=lines,
-                needs_std_module=any(
-                    re.search(r"^\s*import\s+std\s*;", line) for line in lines
-                ),
-                needs_aeronet_module=any(
-                    re.search(r"^\s*import\s+aeronet\s*;", line)
-                    for line in lines
-                ),
+                needs_std_module=needs_std_module,
+                needs_aeronet_module=needs_aeronet_module,
             )
         )
     return snippets
@@ -440,9 +563,13 @@ def is_include_line(line: str) -> bool:
     return line.strip().startswith("#include")
 
 
+@functools.lru_cache(maxsize=None)
+def quoted_source_name(source: Path) -> str:
+    return source.resolve().as_posix().replace('"', '\\"')
+
+
 def source_line_directive(source: Path, line_number: int) -> str:
-    source_name = source.resolve().as_posix().replace('"', '\\"')
-    return f'#line {line_number} "{source_name}"'
+    return f'#line {line_number} "{quoted_source_name(source)}"'
 
 
 def include_key(line: str) -> str:
@@ -456,6 +583,30 @@ def write_source_line(
     destination.extend([source_line_directive(source, line_number), line])
 
 
+def write_text_if_changed(path: Path, text: str) -> bool:
+    """Write text to path unless it already holds it, keeping the mtime for incremental builds."""
+    # Compared as bytes: the previous content needs no decoding or newline translation.
+    data = text.encode()
+    try:
+        if path.read_bytes() == data:
+            return False
+    except OSError:
+        pass
+    path.write_bytes(data)
+    return True
+
+
+def write_precompiled_header(directory: Path) -> Path:
+    header = directory / PRECOMPILED_HEADER_NAME
+    lines = [
+        "// Generated by scripts/verify-md-code.py. Do not edit.",
+        "#pragma once",
+        f"#include {PRECOMPILED_HEADER_INCLUDE}",
+    ]
+    write_text_if_changed(header, "\n".join(lines) + "\n")
+    return header
+
+
 def write_batch_source(batch: SnippetBatch) -> None:
     """Write one translation unit whose snippets retain independent C++ scopes."""
     imports: List[Tuple[Snippet, int, str]] = []
@@ -522,7 +673,7 @@ def write_batch_source(batch: SnippetBatch) -> None:
         lines.extend(["}", ""])
 
     lines.extend(["int main() {", "  return 0;", "}"])
-    batch.path.write_text("\n".join(lines) + "\n")
+    write_text_if_changed(batch.path, "\n".join(lines) + "\n")
 
 
 def make_snippet_batches(
@@ -552,7 +703,36 @@ def make_snippet_batches(
     return batches
 
 
-def locate_libraries(build_dir: Path) -> List[str]:
+@functools.lru_cache(maxsize=None)
+def index_build_tree(build_dir: Path) -> Dict[str, List[Path]]:
+    """Map each file name under build_dir to its paths, gathered in a single directory walk.
+
+    Only call this once the libraries have been built: the index is never refreshed.
+    """
+    index: Dict[str, List[Path]] = {}
+    pending = [str(build_dir)]
+    while pending:
+        try:
+            with os.scandir(pending.pop()) as entries:
+                for entry in entries:
+                    if entry.is_dir(follow_symlinks=False):
+                        pending.append(entry.path)
+                    elif entry.is_file():
+                        index.setdefault(entry.name, []).append(Path(entry.path))
+        except OSError:
+            continue
+    return index
+
+
+def find_build_files(build_dir: Path, pattern: str) -> List[Path]:
+    """Sorted files under build_dir whose name matches the glob pattern."""
+    index = index_build_tree(build_dir)
+    return sorted(
+        path for name in fnmatch.filter(index, pattern) for path in index[name]
+    )
+
+
+def build_link_libraries(build_dir: Path) -> None:
     lib_dir = build_dir / "lib"
     if not lib_dir.is_dir():
         print(
@@ -606,19 +786,14 @@ def locate_libraries(build_dir: Path) -> List[str]:
             file=sys.stderr,
         )
 
+
+def locate_libraries(build_dir: Path) -> List[str]:
     libs: List[str] = []
     primary_path = build_dir / "aeronet" / "main" / "libaeronet.a"
     if primary_path.is_file():
         libs.append(str(primary_path))
-
-    seen = set(libs)
-    candidates = sorted(build_dir.rglob("libaeronet*.a"))
-    for candidate in candidates:
-        candidate_str = str(candidate)
-        if candidate_str in seen:
-            continue
-        libs.append(candidate_str)
-        seen.add(candidate_str)
+    libs.extend(str(candidate) for candidate in find_build_files(build_dir, "libaeronet*.a"))
+    libs = dedupe_preserve(libs)
 
     if not libs:
         print(f"aeronet library not found under {build_dir}", file=sys.stderr)
@@ -626,22 +801,87 @@ def locate_libraries(build_dir: Path) -> List[str]:
     return libs
 
 
+def library_index_key(build_dir: Path) -> Optional[str]:
+    """Identify the state of the build tree, or None when it cannot be told apart.
+
+    Ninja appends to .ninja_log whenever it builds anything, so with CMakeCache.txt and
+    this script unchanged the libraries found last time are still the ones present.
+    """
+    stamps: List[str] = []
+    for path in (build_dir / "CMakeCache.txt", build_dir / ".ninja_log", Path(__file__)):
+        try:
+            stamps.append(f"{path}\0{os.stat(path).st_mtime_ns}")
+        except OSError:
+            return None
+    return "\n".join(stamps)
+
+
+def discover_link_libraries(build_dir: Path) -> Tuple[List[str], List[str], List[str]]:
+    """Return (aeronet libs, dependency libs, unresolved -l flags) for link mode.
+
+    The result is kept in the build directory and reused while library_index_key is
+    unchanged, skipping the walk of the whole build tree.
+    """
+    index_path = build_dir / STATE_DIR_NAME / LIBRARY_INDEX_NAME
+    key = library_index_key(build_dir)
+    if key:
+        try:
+            cached = json.loads(index_path.read_text())
+            if cached["key"] == key:
+                return (
+                    cached["libs"],
+                    cached["dependency_libs"],
+                    cached["dependency_link_flags"],
+                )
+        except (OSError, ValueError, TypeError, KeyError):
+            pass
+
+    libs = locate_libraries(build_dir)
+    dependency_libs, dependency_link_flags = locate_dependency_libraries(build_dir)
+    # Resolve any fallback `-l...` flags into concrete library paths when possible;
+    # only keep unresolved flags (for system libs) in dependency_link_flags.
+    if dependency_link_flags:
+        resolved, dependency_link_flags = resolve_fallback_libs(
+            build_dir, dependency_link_flags
+        )
+        dependency_libs.extend(resolved)
+    if key:
+        write_json_file(
+            index_path,
+            {
+                "key": key,
+                "libs": libs,
+                "dependency_libs": dependency_libs,
+                "dependency_link_flags": dependency_link_flags,
+            },
+            "library index",
+        )
+    return libs, dependency_libs, dependency_link_flags
+
+
 def locate_dependency_libraries(build_dir: Path) -> Tuple[List[str], List[str]]:
+    libs, fallback_flags = _locate_dependency_libraries(build_dir)
+    return list(libs), list(fallback_flags)
+
+
+@functools.lru_cache(maxsize=None)
+def _locate_dependency_libraries(build_dir: Path) -> Tuple[Tuple[str, ...], Tuple[str, ...]]:
+    # Memoized as tuples so callers extending the returned lists cannot alter the cache.
+    index = index_build_tree(build_dir)
+    # One pass over the whole tree index; only the few library names that match any
+    # pattern are then matched pattern by pattern.
+    candidates = [name for name in index if DEPENDENCY_LIBRARY_NAME_PATTERN.match(name)]
     libs: List[str] = []
     fallback_flags: List[str] = []
-    seen = set()
     for pattern, flag in DEPENDENCY_LIBRARY_PATTERNS:
-        matches = sorted(build_dir.rglob(pattern))
+        matches = sorted(
+            path for name in fnmatch.filter(candidates, pattern) for path in index[name]
+        )
         if not matches:
             fallback_flags.append(flag)
             continue
-        for candidate in matches:
-            candidate_str = str(candidate)
-            if candidate_str in seen:
-                continue
-            libs.append(candidate_str)
-            seen.add(candidate_str)
-    return libs, fallback_flags
+        libs.extend(str(candidate) for candidate in matches)
+    return tuple(dedupe_preserve(libs)), tuple(fallback_flags)
 
 
 def resolve_fallback_libs(
@@ -667,9 +907,7 @@ def resolve_fallback_libs(
         patterns = [f"lib{name}*.a", f"lib{name}*.so"]
         found: List[str] = []
         for pat in patterns:
-            for candidate in build_dir.rglob(pat):
-                if candidate.is_file():
-                    found.append(str(candidate))
+            found.extend(str(candidate) for candidate in find_build_files(build_dir, pat))
             if found:
                 break
         # If not found, try some common alternate zlib-ng / zlib names
@@ -684,13 +922,13 @@ def resolve_fallback_libs(
                 "libzlib*.so*",
             ]
             for pat in alt_patterns:
-                for candidate in build_dir.rglob(pat):
-                    if candidate.is_file():
-                        found.append(str(candidate))
+                found.extend(
+                    str(candidate) for candidate in find_build_files(build_dir, pat)
+                )
                 if found:
                     break
         if found:
-            # prefer the first match (sorted by rglob order); prefer .a so patterns already ordered
+            # prefer the first (sorted) match; prefer .a so patterns already ordered
             resolved.append(found[0])
         else:
             unresolved.append(flag)
@@ -698,18 +936,7 @@ def resolve_fallback_libs(
 
 
 def read_cmake_feature_defines(build_dir: Path) -> List[str]:
-    cache_file = build_dir / "CMakeCache.txt"
-    if not cache_file.is_file():
-        return []
-    flags: List[str] = []
-    for line in cache_file.read_text().splitlines():
-        if not line.startswith("AERONET_ENABLE_"):
-            continue
-        if ":BOOL=ON" not in line:
-            continue
-        name = line.split(":BOOL=")[0]
-        flags.append(f"-D{name}=1")
-    return flags
+    return [f"-D{name}=1" for name in enabled_cmake_features(build_dir)]
 
 
 def read_cmake_platform_defines(build_dir: Path) -> List[str]:
@@ -755,16 +982,17 @@ def normalize_define(flag: str) -> str:
 def load_target_usage(
     build_dir: Path, target_name: str = "aeronet"
 ) -> Optional[TargetUsage]:
-    reply_dir = build_dir / ".cmake" / "api" / "v1" / "reply"
-    if not reply_dir.is_dir():
-        return None
+    reply_dir = os.path.join(build_dir, ".cmake", "api", "v1", "reply")
     pattern = f"target-{target_name}-*.json"
-    matches = sorted(
-        reply_dir.glob(pattern), key=lambda path: path.stat().st_mtime, reverse=True
-    )
+    try:
+        with os.scandir(reply_dir) as entries:
+            matches = [entry for entry in entries if fnmatch.fnmatchcase(entry.name, pattern)]
+    except OSError:
+        return None
     if not matches:
         return None
-    data = json.loads(matches[0].read_text())
+    newest = max(matches, key=lambda entry: entry.stat().st_mtime)
+    data = json.loads(Path(newest.path).read_text())
     includes: List[str] = []
     compile_defs: List[str] = []
     compile_opts: List[str] = []
@@ -793,6 +1021,24 @@ def load_target_usage(
     )
 
 
+def strip_warning_options(options: Sequence[str]) -> List[str]:
+    """Drop the aeronet target's warning flags when they cannot fail a snippet build.
+
+    Without -Werror, analyzers such as -Wconversion only cost time. With it (e.g.
+    AERONET_WARNINGS_AS_ERRORS=ON), snippets are held to the project's warnings-as-errors
+    policy, so every warning flag is kept.
+    """
+    if "-Werror" in options:
+        return dedupe_preserve(options)
+    kept = [
+        option
+        for option in options
+        if not option.startswith("-W") or option.startswith(KEPT_WARNING_OPTION_PREFIXES)
+    ]
+    return dedupe_preserve(kept)
+
+
+@functools.lru_cache(maxsize=None)
 def detect_cxx_compiler(build_dir: Path) -> str:
     """Read CMAKE_CXX_COMPILER from CMakeCache.txt, fall back to CXX env or 'c++'."""
     cached = read_cache_entry(build_dir, "CMAKE_CXX_COMPILER")
@@ -801,27 +1047,186 @@ def detect_cxx_compiler(build_dir: Path) -> str:
     return os.environ.get("CXX", "c++")
 
 
+@functools.lru_cache(maxsize=None)
 def uses_libcxx(build_dir: Path) -> bool:
     """Return True if the aeronet build was configured with -stdlib=libc++."""
-    cache_file = build_dir / "CMakeCache.txt"
-    if not cache_file.is_file():
+    return "-stdlib=libc++" in read_cache_text(build_dir)
+
+
+def compiler_launcher(build_dir: Path) -> Optional[str]:
+    """Return the ccache the aeronet build compiles through (AERONET_ENABLE_CCACHE), if any."""
+    if "AERONET_ENABLE_CCACHE" not in enabled_cmake_features(build_dir):
+        return None
+    program = read_cache_entry(build_dir, "CCACHE_PROGRAM")
+    if not program or not os.path.isfile(program):
+        return None
+    return program
+
+
+@functools.lru_cache(maxsize=None)
+def compiler_identity(cxx: str) -> str:
+    """Compiler path and --version banner, identifying the toolchain in module cache keys."""
+    try:
+        result = subprocess.run([cxx, "--version"], capture_output=True, text=True)
+    except OSError:
+        return cxx
+    return f"{cxx}\n{result.stdout}"
+
+
+def update_with_tree_stats(
+    digest: Any, directories: Sequence[str], extensionless: bool = False
+) -> None:
+    """Feed path, size and mtime of every header below directories into digest.
+
+    Other files (sources, docs, objects in fetched dependency trees) are not stat'ed,
+    hidden directories such as .git are skipped, and a directory nested in another
+    listed one is only walked once. With extensionless, files without a suffix (the
+    standard library headers) count as headers too.
+    """
+    roots = sorted({os.path.normpath(directory) for directory in directories})
+    for index, root in enumerate(roots):
+        if any(root.startswith(parent + os.sep) for parent in roots[:index]):
+            continue
+        pending = [root]
+        while pending:
+            try:
+                with os.scandir(pending.pop()) as entries:
+                    for entry in sorted(entries, key=lambda entry: entry.name):
+                        if entry.is_dir(follow_symlinks=False):
+                            if not entry.name.startswith("."):
+                                pending.append(entry.path)
+                            continue
+                        if not entry.name.endswith(HEADER_SUFFIXES) and not (
+                            extensionless and "." not in entry.name
+                        ):
+                            continue
+                        stat = entry.stat()
+                        digest.update(
+                            f"{entry.path}\0{stat.st_size}\0{stat.st_mtime_ns}\n".encode()
+                        )
+            except OSError:
+                continue
+
+
+def module_cache_key(
+    cxx: str,
+    flags: Sequence[str],
+    inputs: Sequence[Path],
+    include_dirs: Sequence[str] = (),
+    system_include_dirs: Sequence[str] = (),
+) -> str:
+    """Hash everything a precompiled module depends on.
+
+    Headers reachable through include_dirs and system_include_dirs are fingerprinted by
+    path, size and mtime rather than content: any edit changes the key, and clang would
+    reject a module whose headers changed anyway.
+    """
+    digest = hashlib.sha256(compiler_identity(cxx).encode())
+    digest.update("\0".join(flags).encode())
+    for path in inputs:
+        digest.update(path.read_bytes())
+    update_with_tree_stats(digest, include_dirs)
+    update_with_tree_stats(digest, system_include_dirs, extensionless=True)
+    return digest.hexdigest()[:32]
+
+
+def snippet_environment_key(
+    cxx: str, settings: Sequence[str], include_dirs: Sequence[str], link_files: Sequence[str]
+) -> str:
+    """Hash everything besides its own text that decides whether a snippet builds.
+
+    This covers the toolchain, every flag, this script, the headers reachable through
+    include_dirs and the libraries linked against (path, size and mtime).
+    """
+    digest = hashlib.sha256(compiler_identity(cxx).encode())
+    digest.update("\0".join(settings).encode())
+    digest.update(Path(__file__).read_bytes())
+    update_with_tree_stats(digest, include_dirs)
+    for path in [*link_files, "modules/aeronet.cppm"]:
+        try:
+            stat = os.stat(path)
+        except OSError:
+            continue
+        digest.update(f"{path}\0{stat.st_size}\0{stat.st_mtime_ns}\n".encode())
+    return digest.hexdigest()
+
+
+def snippet_cache_key(environment_key: str, snippet: Snippet) -> str:
+    digest = hashlib.sha256(environment_key.encode())
+    digest.update("\n".join(snippet.lines).encode())
+    return digest.hexdigest()[:32]
+
+
+def load_snippet_manifest(path: Path) -> Set[str]:
+    """Return the keys of the snippets that built successfully in previous runs."""
+    try:
+        return set(json.loads(path.read_text()).get("built", []))
+    except (OSError, ValueError, AttributeError):
+        return set()
+
+
+def save_snippet_manifest(path: Path, keys: Set[str]) -> None:
+    write_json_file(path, {"built": sorted(keys)}, "built snippets")
+
+
+def write_json_file(path: Path, data: Dict[str, Any], description: str) -> None:
+    """Publish data to path with a rename; failing only costs the next run some work."""
+    partial = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        partial.write_text(json.dumps(data, indent=0) + "\n")
+        os.replace(partial, path)
+    except OSError as exc:
+        partial.unlink(missing_ok=True)
+        print(f"Warning: could not record {description} in {path} ({exc})", file=sys.stderr)
+
+
+def prepare_module_cache_dir(cache_dir: Optional[Path]) -> Optional[Path]:
+    if cache_dir is None:
+        return None
+    try:
+        cache_dir.mkdir(parents=True, exist_ok=True)
+    except OSError as exc:
+        print(f"Warning: module cache disabled ({exc})", file=sys.stderr)
+        return None
+    return cache_dir
+
+
+def compile_to(cmd: List[str], output: Path, failure_message: str) -> bool:
+    """Run cmd with `-o` pointing at a temporary sibling of output, then move it in place.
+
+    Publishing with a rename keeps concurrent runs sharing a cache directory from ever
+    seeing a partially written file.
+    """
+    partial = output.with_name(f"{output.name}.{os.getpid()}.tmp")
+    result = subprocess.run(
+        cmd + ["-o", str(partial)],
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.PIPE,
+        text=True,
+        errors="replace",
+    )
+    if result.returncode != 0:
+        partial.unlink(missing_ok=True)
+        print(failure_message, file=sys.stderr)
+        if result.stderr:
+            dump_output(result.stderr)
         return False
-    content = cache_file.read_text()
-    return "-stdlib=libc++" in content
+    os.replace(partial, output)
+    return True
 
 
-def build_std_module(build_dir: Path, cxx: str) -> Optional[Path]:
+def build_std_module(
+    build_dir: Path, cxx: str, cache_dir: Optional[Path] = None
+) -> Optional[Path]:
     """Build the C++23 std module and return path to std.pcm if successful.
 
     The std module (import std;) requires libc++.  If the detected compiler
     does not appear to be Clang or libc++ is unavailable, this returns None.
+    When cache_dir is given, the module is reused from (or stored into) it.
     """
-    std_pcm = build_dir / "std.pcm"
-    if std_pcm.exists():
-        return std_pcm
-
     # Try to find a version suffix from the compiler name (e.g. clang++-21 -> 21)
-    ver_match = re.search(r"(\d+)$", cxx)
+    ver_match = COMPILER_VERSION_SUFFIX_PATTERN.search(cxx)
     ver = ver_match.group(1) if ver_match else ""
 
     # Common locations for std.cppm with libc++
@@ -844,23 +1249,36 @@ def build_std_module(build_dir: Path, cxx: str) -> Optional[Path]:
         print("Warning: Could not find std.cppm for module build", file=sys.stderr)
         return None
 
-    print(f"Building std.pcm module from {std_cppm}")
-
-    cmd = [
-        cxx,
+    flags = [
         "-std=gnu++23",
         "-stdlib=libc++",
         "--precompile",
-        "-o", str(std_pcm),
         str(std_cppm),
         "-Wno-reserved-module-identifier",
     ]
+    cache_dir = prepare_module_cache_dir(cache_dir)
+    if cache_dir:
+        # The module sources include the libc++ headers, so a libc++ upgrade that keeps
+        # std.cppm byte-identical must still produce a new key.
+        libcxx_header_dirs = [
+            Path(f"/usr/lib/llvm-{ver}/include/c++/v1") if ver else None,
+            Path("/usr/include/c++/v1"),
+        ]
+        header_dirs = [str(std_cppm.parent)] + [
+            str(directory)
+            for directory in libcxx_header_dirs
+            if directory and directory.is_dir()
+        ]
+        key = module_cache_key(cxx, flags, [std_cppm], system_include_dirs=header_dirs)
+        std_pcm = cache_dir / f"std-{key}.pcm"
+    else:
+        std_pcm = build_dir / "std.pcm"
+    if std_pcm.exists():
+        print(f"Reusing std.pcm module {std_pcm}")
+        return std_pcm
 
-    result = subprocess.run(cmd, capture_output=True, text=True)
-    if result.returncode != 0:
-        print("Failed to build std.pcm module", file=sys.stderr)
-        if result.stderr:
-            dump_output(result.stderr)
+    print(f"Building std.pcm module from {std_cppm}")
+    if not compile_to([cxx, *flags], std_pcm, "Failed to build std.pcm module"):
         return None
 
     print(f"Successfully built std.pcm at {std_pcm}")
@@ -880,59 +1298,56 @@ def build_aeronet_module(
     cxx: str,
     libcxx: bool = False,
     std_pcm_path: Optional[Path] = None,
+    cache_dir: Optional[Path] = None,
 ) -> Optional[ModulePaths]:
-    """Build the aeronet C++ module and return paths to aeronet.pcm and aeronet.o."""
-    aeronet_pcm = build_dir / "aeronet.pcm"
-    aeronet_obj = build_dir / "aeronet.o"
-    if aeronet_pcm.exists() and aeronet_obj.exists():
-        return ModulePaths(pcm=aeronet_pcm, obj=aeronet_obj)
+    """Build the aeronet C++ module and return paths to aeronet.pcm and aeronet.o.
 
+    When cache_dir is given, the module is reused from (or stored into) it.
+    """
     aeronet_cppm = Path("modules/aeronet.cppm")
     if not aeronet_cppm.exists():
         print(f"Warning: Could not find {aeronet_cppm} for module build", file=sys.stderr)
         return None
 
-    print(f"Building aeronet.pcm module from {aeronet_cppm}")
-
-    cmd = [
-        cxx,
-        "-std=gnu++23",
-        "--precompile",
-        "-o", str(aeronet_pcm),
-        str(aeronet_cppm),
-    ]
+    flags = ["-std=gnu++23", "--precompile", str(aeronet_cppm)]
 
     if libcxx:
-        cmd.append("-stdlib=libc++")
+        flags.append("-stdlib=libc++")
 
     for inc_dir in include_dirs:
-        cmd.extend(["-I", inc_dir])
+        flags.extend(["-I", inc_dir])
 
     for define in compile_definitions:
         if define.startswith("-D"):
-            cmd.append(define)
+            flags.append(define)
         else:
-            cmd.append(f"-D{define}")
+            flags.append(f"-D{define}")
 
     if std_pcm_path:
-        cmd.append(f"-fmodule-file=std={std_pcm_path}")
+        flags.append(f"-fmodule-file=std={std_pcm_path}")
+
+    cache_dir = prepare_module_cache_dir(cache_dir)
+    if cache_dir:
+        inputs = [aeronet_cppm] + ([std_pcm_path] if std_pcm_path else [])
+        key = module_cache_key(cxx, flags, inputs, include_dirs)
+        aeronet_pcm = cache_dir / f"aeronet-{key}.pcm"
+        aeronet_obj = cache_dir / f"aeronet-{key}.o"
+    else:
+        aeronet_pcm = build_dir / "aeronet.pcm"
+        aeronet_obj = build_dir / "aeronet.o"
+    if aeronet_pcm.exists() and aeronet_obj.exists():
+        print(f"Reusing aeronet module {aeronet_pcm}")
+        return ModulePaths(pcm=aeronet_pcm, obj=aeronet_obj)
 
-    result = subprocess.run(cmd, capture_output=True, text=True)
-    if result.returncode != 0:
-        print("Failed to build aeronet.pcm module", file=sys.stderr)
-        if result.stderr:
-            dump_output(result.stderr)
+    print(f"Building aeronet.pcm module from {aeronet_cppm}")
+    if not compile_to([cxx, *flags], aeronet_pcm, "Failed to build aeronet.pcm module"):
         return None
 
     # Compile the BMI to an object file (contains the module initializer)
-    obj_cmd = [cxx, "-std=gnu++23", "-c", str(aeronet_pcm), "-o", str(aeronet_obj)]
+    obj_cmd = [cxx, "-std=gnu++23", "-c", str(aeronet_pcm)]
     if libcxx:
         obj_cmd.append("-stdlib=libc++")
-    result = subprocess.run(obj_cmd, capture_output=True, text=True)
-    if result.returncode != 0:
-        print("Failed to compile aeronet.pcm to object file", file=sys.stderr)
-        if result.stderr:
-            dump_output(result.stderr)
+    if not compile_to(obj_cmd, aeronet_obj, "Failed to compile aeronet.pcm to object file"):
         return None
 
     print(f"Successfully built aeronet module at {aeronet_pcm}")
@@ -958,90 +1373,110 @@ def write_cmake_project(
     std_pcm_path: Optional[Path] = None,
     aeronet_module: Optional[ModulePaths] = None,
     libcxx: bool = False,
+    launcher: Optional[str] = None,
+    precompiled_header: Optional[Path] = None,
 ) -> Path:
     cmakelists = project_dir / "CMakeLists.txt"
     env_target = "aeronet_doc_env"
-    lines: List[str] = [
-        "cmake_minimum_required(VERSION 3.23)",
-        "project(aeronet_doc_snippets LANGUAGES CXX)",
-        "set(CMAKE_CXX_STANDARD 23)",
-        "set(CMAKE_CXX_STANDARD_REQUIRED ON)",
-        f"add_library({env_target} INTERFACE)",
-    ]
+    with io.StringIO() as fh:
+        write = fh.write
+        writelines = fh.writelines
+        write(
+            "cmake_minimum_required(VERSION 3.23)\n"
+            # The compiler already built aeronet: skip the try-compile checking it works.
+            "set(CMAKE_CXX_COMPILER_WORKS ON)\n"
+            "project(aeronet_doc_snippets LANGUAGES CXX)\n"
+            'set(CMAKE_TRY_COMPILE_CONFIGURATION "${CMAKE_BUILD_TYPE}")\n'
+            "set(CMAKE_CXX_STANDARD 23)\n"
+            "set(CMAKE_CXX_STANDARD_REQUIRED ON)\n"
+            f"add_library({env_target} INTERFACE)\n"
+        )
+        if launcher:
+            write(f'set_property(GLOBAL PROPERTY RULE_LAUNCH_COMPILE "{cmake_escape(launcher)}")\n')
 
-    if include_dirs:
-        lines.append(f"target_include_directories({env_target} INTERFACE")
-        for directory in include_dirs:
-            lines.append(f'  "{cmake_escape(directory)}"')
-        lines.append(")")
+        if include_dirs:
+            write(f"target_include_directories({env_target} INTERFACE\n")
+            writelines(f'  "{cmake_escape(directory)}"\n' for directory in include_dirs)
+            write(")\n")
 
-    if compile_definitions:
-        lines.append(f"target_compile_definitions({env_target} INTERFACE")
-        for define in compile_definitions:
-            lines.append(f"  {define}")
-        lines.append(")")
+        if compile_definitions:
+            write(f"target_compile_definitions({env_target} INTERFACE\n")
+            writelines(f"  {define}\n" for define in compile_definitions)
+            write(")\n")
 
-    if compile_options:
-        lines.append(f"target_compile_options({env_target} INTERFACE")
-        for option in compile_options:
-            lines.append(f"  {option}")
-        lines.append(")")
+        if compile_options:
+            write(f"target_compile_options({env_target} INTERFACE\n")
+            writelines(f"  {option}\n" for option in compile_options)
+            write(")\n")
 
-    if link_mode:
-        link_entries = (
-            libs + dependency_libs + dependency_link_flags + system_link_flags
-        )
-        if link_entries:
-            use_link_group = len(link_entries) > 1
-            lines.append(f"target_link_libraries({env_target} INTERFACE")
-            if use_link_group:
-                lines.append("  -Wl,--start-group")
-            for entry in link_entries:
-                if entry.startswith("-"):
-                    lines.append(f"  {entry}")
-                else:
-                    lines.append(f'  "{cmake_escape(entry)}"')
-            if use_link_group:
-                lines.append("  -Wl,--end-group")
-            lines.append(")")
-        if sanitize_flags:
-            lines.append(f"target_link_options({env_target} INTERFACE")
-            for flag in sanitize_flags:
-                lines.append(f"  {flag}")
-            lines.append(")")
-
-    for target in snippet_batches:
-        source = cmake_escape(target.rel_source.as_posix())
         if link_mode:
-            lines.append(f'add_executable({target.target} "{source}")')
-        else:
-            lines.append(f'add_library({target.target} OBJECT "{source}")')
-        lines.append(f"target_link_libraries({target.target} PRIVATE {env_target})")
-        
-        module_flags: List[str] = []
-        if target.needs_std_module and std_pcm_path:
-            std_pcm = cmake_escape(str(std_pcm_path))
-            module_flags.append(f'-fmodule-file=std={std_pcm}')
-        if target.needs_aeronet_module and aeronet_module:
-            aeronet_pcm = cmake_escape(str(aeronet_module.pcm))
-            module_flags.append(f'-fmodule-file=aeronet={aeronet_pcm}')
-
-        if module_flags:
-            lines.append(f"target_compile_options({target.target} PRIVATE")
-            if libcxx or target.needs_std_module:
-                lines.append("  -stdlib=libc++")
-            for flag in module_flags:
-                lines.append(f'  "{flag}"')
-            lines.append(")")
-            if libcxx or target.needs_std_module:
-                lines.append(f"target_link_options({target.target} PRIVATE -stdlib=libc++ -lc++)")
-
-        # Link the compiled module object so the module initializer is defined
-        if link_mode and target.needs_aeronet_module and aeronet_module:
-            obj_escaped = cmake_escape(str(aeronet_module.obj))
-            lines.append(f'target_link_libraries({target.target} PRIVATE "{obj_escaped}")')
-
-    cmakelists.write_text("\n".join(lines) + "\n")
+            link_entries = (
+                libs + dependency_libs + dependency_link_flags + system_link_flags
+            )
+            if link_entries:
+                use_link_group = len(link_entries) > 1
+                write(f"target_link_libraries({env_target} INTERFACE\n")
+                if use_link_group:
+                    write("  -Wl,--start-group\n")
+                writelines(
+                    f"  {entry}\n" if entry.startswith("-") else f'  "{cmake_escape(entry)}"\n'
+                    for entry in link_entries
+                )
+                if use_link_group:
+                    write("  -Wl,--end-group\n")
+                write(")\n")
+            if sanitize_flags:
+                write(f"target_link_options({env_target} INTERFACE\n")
+                writelines(f"  {flag}\n" for flag in sanitize_flags)
+                write(")\n")
+
+        # Shared by every module-using target; escape once.
+        std_pcm = cmake_escape(str(std_pcm_path)) if std_pcm_path else ""
+        aeronet_pcm = cmake_escape(str(aeronet_module.pcm)) if aeronet_module else ""
+        aeronet_obj = cmake_escape(str(aeronet_module.obj)) if aeronet_module else ""
+        # The first batch without module imports precompiles the header, the others reuse it.
+        pch_target: Optional[str] = None
+        for target in snippet_batches:
+            source = cmake_escape(target.rel_source.as_posix())
+            if link_mode:
+                write(f'add_executable({target.target} "{source}")\n')
+            else:
+                write(f'add_library({target.target} OBJECT "{source}")\n')
+            write(f"target_link_libraries({target.target} PRIVATE {env_target})\n")
+            if precompiled_header and not (
+                target.needs_std_module or target.needs_aeronet_module
+            ):
+                if pch_target:
+                    write(f"target_precompile_headers({target.target} REUSE_FROM {pch_target})\n")
+                else:
+                    pch_target = target.target
+                    write(
+                        f"target_precompile_headers({target.target} PRIVATE "
+                        f'"{cmake_escape(str(precompiled_header))}")\n'
+                    )
+
+            module_flags: List[str] = []
+            if target.needs_std_module and std_pcm:
+                module_flags.append(f'-fmodule-file=std={std_pcm}')
+            if target.needs_aeronet_module and aeronet_pcm:
+                module_flags.append(f'-fmodule-file=aeronet={aeronet_pcm}')
+
+            if module_flags:
+                write(f"target_compile_options({target.target} PRIVATE\n")
+                if libcxx or target.needs_std_module:
+                    write("  -stdlib=libc++\n")
+                writelines(f'  "{flag}"\n' for flag in module_flags)
+                write(")\n")
+                if libcxx or target.needs_std_module:
+                    write(
+                        f"target_link_options({target.target} PRIVATE -stdlib=libc++ -lc++)\n"
+                    )
+
+            # Link the compiled module object so the module initializer is defined
+            if link_mode and target.needs_aeronet_module and aeronet_obj:
+                write(f'target_link_libraries({target.target} PRIVATE "{aeronet_obj}")\n')
+
+        write_text_if_changed(cmakelists, fh.getvalue())
     return cmakelists
 
 
@@ -1060,30 +1495,202 @@ def configure_cmake_project(
         cmd.append(f"-DCMAKE_BUILD_TYPE={build_type}")
     if cxx_compiler:
         cmd.append(f"-DCMAKE_CXX_COMPILER={cxx_compiler}")
-    result = subprocess.run(cmd, capture_output=True, text=True)
+    # A build tree kept in --work-dir regenerates itself when CMakeLists.txt changes, so
+    # configuring again is only needed for a different command.
+    stamp = build_dir / "doc-verify-configure.txt"
+    stamp_text = "\n".join(cmd) + "\n"
+    try:
+        if (build_dir / "CMakeCache.txt").is_file() and stamp.read_text() == stamp_text:
+            return True
+    except OSError:
+        pass
+    result = subprocess.run(
+        cmd, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True, errors="replace"
+    )
     if result.returncode == 0:
+        stamp.write_text(stamp_text)
         return True
+    stamp.unlink(missing_ok=True)
     print("CMake configure failed", file=sys.stderr)
-    if result.stderr:
-        dump_output(result.stderr)
     if result.stdout:
         dump_output(result.stdout)
     return False
 
 
-def build_cmake_target(cmake_bin: str, build_dir: Path, target: str) -> bool:
+def build_cmake_target(
+    cmake_bin: str, build_dir: Path, target: str, env: Optional[Dict[str, str]] = None
+) -> bool:
     cmd = [cmake_bin, "--build", str(build_dir), "--target", target]
-    result = subprocess.run(cmd, capture_output=True, text=True)
+    result = subprocess.run(
+        cmd,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.STDOUT,
+        text=True,
+        errors="replace",
+        env=env,
+    )
     if result.returncode == 0:
         return True
     print(f"Build failed for target {target}", file=sys.stderr)
-    if result.stderr:
-        dump_output(result.stderr)
     if result.stdout:
         dump_output(result.stdout)
     return False
 
 
+def keep_going_flags(generator: Optional[str]) -> List[str]:
+    """Native build tool flags that keep building the other targets after a failure."""
+    if generator and "Ninja" in generator:
+        return ["-k", "0"]
+    if generator and "Makefiles" in generator:
+        return ["-k"]
+    return []
+
+
+def build_all_cmake_targets(
+    cmake_bin: str,
+    build_dir: Path,
+    targets: Sequence[str],
+    jobs: Optional[int],
+    generator: Optional[str] = None,
+    env: Optional[Dict[str, str]] = None,
+) -> bool:
+    """Build every target in one invocation so the generator schedules them as one graph.
+
+    The build keeps going past failures, so every target that can be built is.
+    """
+    cmd = [cmake_bin, "--build", str(build_dir), "--target", *targets, "--parallel"]
+    if jobs:
+        cmd.append(str(jobs))
+    native_flags = keep_going_flags(generator)
+    if native_flags:
+        cmd.extend(["--", *native_flags])
+    # Output is not needed: failures are rebuilt and reported per batch.
+    result = subprocess.run(
+        cmd, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, env=env
+    )
+    return result.returncode == 0
+
+
+def cmake_batch_output(build_dir: Path, batch: SnippetBatch, link_mode: bool) -> Path:
+    """Where a single-configuration generator puts the object or executable of a batch."""
+    if link_mode:
+        return build_dir / batch.target
+    return build_dir / "CMakeFiles" / f"{batch.target}.dir" / f"{batch.rel_source.as_posix()}.o"
+
+
+def direct_compile_prefix(
+    cxx: str,
+    build_type: Optional[str],
+    include_dirs: Sequence[str],
+    compile_definitions: Sequence[str],
+    compile_options: Sequence[str],
+) -> List[str]:
+    """Compiler invocation shared by every batch, equivalent to the CMake environment target."""
+    cmd = [cxx, *BUILD_TYPE_FLAGS.get((build_type or "").lower(), []), "-std=gnu++23"]
+    cmd.extend(f"-D{define}" for define in compile_definitions)
+    cmd.extend(f"-I{directory}" for directory in include_dirs)
+    cmd.extend(compile_options)
+    return cmd
+
+
+def build_precompiled_header(header: Path, compile_prefix: Sequence[str]) -> bool:
+    """Precompile header to header.gch, which both GCC and Clang pick up for `-include header`."""
+    cmd = [*compile_prefix, "-x", "c++-header", str(header)]
+    if "clang" in compiler_identity(compile_prefix[0]).lower():
+        # Lets ccache hash the consumers of the precompiled header.
+        cmd.extend(["-Xclang", "-fno-pch-timestamp"])
+    return compile_to(
+        cmd,
+        header.with_name(f"{header.name}.gch"),
+        "Warning: precompiled header build failed; compiling batches without it",
+    )
+
+
+def direct_batch_commands(
+    batch: SnippetBatch,
+    compile_prefix: Sequence[str],
+    link_entries: Sequence[str],
+    sanitize_flags: Sequence[str],
+    link_mode: bool,
+    std_pcm_path: Optional[Path] = None,
+    aeronet_module: Optional[ModulePaths] = None,
+    libcxx: bool = False,
+    launcher: Optional[str] = None,
+    precompiled_header: Optional[Path] = None,
+    syntax_only: bool = False,
+) -> List[List[str]]:
+    """Return the compile (and, in link mode, link) commands for one batch."""
+    module_flags: List[str] = []
+    if batch.needs_std_module and std_pcm_path:
+        module_flags.append(f"-fmodule-file=std={std_pcm_path}")
+    if batch.needs_aeronet_module and aeronet_module:
+        module_flags.append(f"-fmodule-file=aeronet={aeronet_module.pcm}")
+    use_libcxx = bool(module_flags) and (libcxx or batch.needs_std_module)
+
+    obj = batch.path.with_suffix(".o")
+    compile_cmd = [launcher, *compile_prefix] if launcher else list(compile_prefix)
+    if use_libcxx:
+        compile_cmd.append("-stdlib=libc++")
+    compile_cmd.extend(module_flags)
+    if precompiled_header and not (batch.needs_std_module or batch.needs_aeronet_module):
+        compile_cmd.extend(["-include", str(precompiled_header)])
+    if syntax_only:
+        compile_cmd.extend(["-fsyntax-only", str(batch.path)])
+        return [compile_cmd]
+    compile_cmd.extend(["-c", str(batch.path), "-o", str(obj)])
+    if not link_mode:
+        return [compile_cmd]
+
+    link_cmd = [compile_prefix[0], *sanitize_flags]
+    if use_libcxx:
+        link_cmd.append("-stdlib=libc++")
+    link_cmd.append(str(obj))
+    # Link the compiled module object so the module initializer is defined
+    if batch.needs_aeronet_module and aeronet_module:
+        link_cmd.append(str(aeronet_module.obj))
+    if len(link_entries) > 1:
+        link_cmd.extend(["-Wl,--start-group", *link_entries, "-Wl,--end-group"])
+    else:
+        link_cmd.extend(link_entries)
+    if use_libcxx:
+        link_cmd.append("-lc++")
+    link_cmd.extend(["-o", str(batch.path.with_suffix(""))])
+    return [compile_cmd, link_cmd]
+
+
+def build_snippet_batch_directly(
+    index: int,
+    batch: SnippetBatch,
+    commands: Sequence[List[str]],
+    env: Optional[Dict[str, str]] = None,
+) -> bool:
+    for cmd in commands:
+        try:
+            result = subprocess.run(
+                cmd,
+                # Run from the work dir so that, relative to CCACHE_BASEDIR, the command
+                # line is the same from one run (and temporary directory) to the next.
+                cwd=batch.path.parent,
+                env=env,
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.PIPE,
+                text=True,
+                errors="replace",
+            )
+        except OSError as exc:
+            print(f"Unexpected error building batch #{index}: {exc}", file=sys.stderr)
+            return False
+        if result.returncode != 0:
+            print(
+                f"Build failed for batch #{index} ({batch_locations(batch)})",
+                file=sys.stderr,
+            )
+            if result.stderr:
+                dump_output(result.stderr)
+            return False
+    return True
+
+
 def batch_locations(batch: SnippetBatch) -> str:
     return ", ".join(
         f"#{snippet.index} {snippet.source}:{snippet.source_line}"
@@ -1096,12 +1703,44 @@ def build_snippet_batch_task(
     batch: SnippetBatch,
     cmake_bin: str,
     build_dir: Path,
+    env: Optional[Dict[str, str]] = None,
 ) -> bool:
     print(
         f"Building batch #{index} ({len(batch.snippets)} snippets: "
         f"{batch_locations(batch)})"
     )
-    return build_cmake_target(cmake_bin, build_dir, batch.target)
+    return build_cmake_target(cmake_bin, build_dir, batch.target, env)
+
+
+def build_snippet_batches(
+    numbered_batches: Sequence[Tuple[int, SnippetBatch]],
+    cmake_bin: str,
+    build_dir: Path,
+    jobs: Optional[int],
+    env: Optional[Dict[str, str]] = None,
+) -> int:
+    """Build each (1-based index, batch) target separately and return the number of failures.
+
+    The index is the batch's position among all batches, matching its target name.
+    """
+
+    def build(idx: int, batch: SnippetBatch) -> bool:
+        try:
+            return build_snippet_batch_task(idx, batch, cmake_bin, build_dir, env)
+        except Exception as exc:
+            print(f"Unexpected error building batch #{idx}: {exc}", file=sys.stderr)
+            return False
+
+    indices = [idx for idx, _ in numbered_batches]
+    snippet_batches = [batch for _, batch in numbered_batches]
+    job_limit = jobs if jobs and jobs > 1 else None
+    if job_limit:
+        # Only the count matters, so no per-future completion tracking is needed.
+        with concurrent.futures.ThreadPoolExecutor(max_workers=job_limit) as executor:
+            results = list(executor.map(build, indices, snippet_batches))
+    else:
+        results = list(map(build, indices, snippet_batches))
+    return results.count(False)
 
 
 def main() -> None:
@@ -1154,7 +1793,7 @@ def main() -> None:
     include_dirs.extend(gather_user_include_dirs(args.include))
     # The HTTP client lives in its own module whose public include tree is not pulled in by the
     # main `aeronet` target metadata; add it explicitly so documentation snippets using
-    # <aeronet/http-client.hpp> compile (the matching libaeronet_client.a is linked via rglob).
+    # <aeronet/http-client.hpp> compile (locate_libraries links the matching libaeronet_client.a).
     client_include = Path("aeronet/client/include")
     if client_include.is_dir():
         include_dirs.append(str(client_include.resolve()))
@@ -1165,27 +1804,30 @@ def main() -> None:
     for flag in sanitize_flags:
         if flag not in compile_options:
             compile_options.append(flag)
-    compile_options = dedupe_preserve(compile_options)
+    compile_options = strip_warning_options(compile_options)
 
     libs: List[str] = []
     dependency_libs: List[str] = []
     dependency_link_flags: List[str] = []
     if args.link:
-        libs = locate_libraries(build_dir)
-        dependency_libs, dependency_link_flags = locate_dependency_libraries(build_dir)
-        # Resolve any fallback `-l...` flags into concrete library paths when possible;
-        # only keep unresolved flags (for system libs) in dependency_link_flags.
-        if dependency_link_flags:
-            resolved, dependency_link_flags = resolve_fallback_libs(
-                build_dir, dependency_link_flags
-            )
-            dependency_libs.extend(resolved)
+        build_link_libraries(build_dir)
+        libs, dependency_libs, dependency_link_flags = discover_link_libraries(build_dir)
 
     snippets: List[Snippet] = []
-    with tempfile.TemporaryDirectory(prefix="aeronet-verify-md-") as tmpdir:
-        tmp_path = Path(tmpdir)
-        for source in sources:
-            snippets.extend(extract_snippets(source, len(snippets) + 1))
+    work_dir_context = (
+        contextlib.nullcontext(args.work_dir)
+        if args.work_dir
+        else tempfile.TemporaryDirectory(prefix="aeronet-verify-md-")
+    )
+    with work_dir_context as work_dir:
+        tmp_path = Path(work_dir).resolve()
+        tmp_path.mkdir(parents=True, exist_ok=True)
+        # Reading and scanning are independent per file; numbering stays in source order.
+        workers = max(1, min(len(sources), os.cpu_count() or 1))
+        with concurrent.futures.ThreadPoolExecutor(max_workers=workers) as executor:
+            source_blocks = list(executor.map(read_code_blocks, sources))
+        for source, blocks in zip(sources, source_blocks):
+            snippets.extend(extract_snippets(source, blocks, len(snippets) + 1))
 
         if not snippets:
             print(
@@ -1196,107 +1838,243 @@ def main() -> None:
 
         cxx = detect_cxx_compiler(build_dir)
         libcxx = uses_libcxx(build_dir)
+        build_type = args.cmake_build_type or read_cache_entry(
+            build_dir, "CMAKE_BUILD_TYPE"
+        )
 
-        needs_std = any(snippet.needs_std_module for snippet in snippets)
-        needs_aeronet = any(snippet.needs_aeronet_module for snippet in snippets)
+        # Skip snippets that already built with the very same toolchain, flags, headers and
+        # libraries: rebuilding them cannot reveal anything new.
+        link_entries = libs + dependency_libs + dependency_link_flags + SYSTEM_LINK_FLAGS
+        environment_key = snippet_environment_key(
+            cxx,
+            [
+                f"build_type={build_type}",
+                f"link={args.link}",
+                f"syntax_only={args.syntax_only}",
+                f"libcxx={libcxx}",
+                f"use_cmake={args.use_cmake}",
+                f"generator={args.generator}",
+                f"snippets_per_batch={args.snippets_per_batch}",
+                *include_dirs,
+                *compile_definitions,
+                *compile_options,
+                *sanitize_flags,
+                *link_entries,
+            ],
+            include_dirs,
+            libs + dependency_libs,
+        )
+        snippet_keys = {
+            snippet.index: snippet_cache_key(environment_key, snippet) for snippet in snippets
+        }
+        manifest_path = build_dir / STATE_DIR_NAME / SNIPPET_MANIFEST_NAME
+        known_good = set() if args.no_snippet_cache else load_snippet_manifest(manifest_path)
+        # Identical snippets share a key, so the first one built stands for its repeats.
+        pending_by_key: Dict[str, Snippet] = {}
+        unchanged = 0
+        for snippet in snippets:
+            key = snippet_keys[snippet.index]
+            if key in known_good:
+                unchanged += 1
+            else:
+                pending_by_key.setdefault(key, snippet)
+        pending_snippets = list(pending_by_key.values())
+        duplicates = len(snippets) - unchanged - len(pending_snippets)
+        if not pending_snippets:
+            print(
+                f"Checked {len(snippets)} code snippets ({unchanged} unchanged since a "
+                f"successful build) and {checked_links} internal Markdown links, 0 failures"
+            )
+            return
 
-        std_pcm_path = None
-        if needs_std:
-            std_pcm_path = build_std_module(tmp_path, cxx)
-            if not std_pcm_path:
-                print("Warning: Some snippets need std module but build failed", file=sys.stderr)
+        needs_std = any(snippet.needs_std_module for snippet in pending_snippets)
+        needs_aeronet = any(snippet.needs_aeronet_module for snippet in pending_snippets)
 
-        aeronet_module = None
-        if needs_aeronet:
-            aeronet_module = build_aeronet_module(
-                tmp_path,
-                include_dirs,
-                compile_definitions,
-                cxx,
-                libcxx,
-                std_pcm_path,
-            )
-            if not aeronet_module:
-                print("Warning: Some snippets need aeronet module but build failed", file=sys.stderr)
+        module_cache_dir = (
+            Path(args.module_cache_dir).expanduser() if args.module_cache_dir else None
+        )
+
+        def build_modules() -> Tuple[Optional[Path], Optional[ModulePaths]]:
+            std_pcm_path = None
+            if needs_std:
+                std_pcm_path = build_std_module(tmp_path, cxx, module_cache_dir)
+                if not std_pcm_path:
+                    print("Warning: Some snippets need std module but build failed", file=sys.stderr)
+
+            aeronet_module = None
+            if needs_aeronet:
+                aeronet_module = build_aeronet_module(
+                    tmp_path,
+                    include_dirs,
+                    compile_definitions,
+                    cxx,
+                    libcxx,
+                    std_pcm_path,
+                    module_cache_dir,
+                )
+                if not aeronet_module:
+                    print("Warning: Some snippets need aeronet module but build failed", file=sys.stderr)
+            return std_pcm_path, aeronet_module
 
         snippet_batches = make_snippet_batches(
-            snippets, args.snippets_per_batch, tmp_path
+            pending_snippets, args.snippets_per_batch, tmp_path
         )
+        duplicates_note = f", {duplicates} repeated snippets skipped" if duplicates else ""
         print(
-            f"Building {len(snippets)} snippets in {len(snippet_batches)} batches "
-            f"(up to {args.snippets_per_batch} snippets per batch)"
+            f"Building {len(pending_snippets)} snippets in {len(snippet_batches)} batches "
+            f"(up to {args.snippets_per_batch} snippets per batch{duplicates_note})"
         )
 
-        write_cmake_project(
-            tmp_path,
-            snippet_batches,
-            include_dirs,
-            compile_definitions,
-            compile_options,
-            libs,
-            dependency_libs,
-            dependency_link_flags,
-            SYSTEM_LINK_FLAGS,
-            sanitize_flags,
-            args.link,
-            std_pcm_path,
-            aeronet_module,
-            libcxx,
-        )
-
-        build_type = args.cmake_build_type or read_cache_entry(
-            build_dir, "CMAKE_BUILD_TYPE"
+        # Precompiling pays off once several batches share the header.
+        plain_batches = sum(
+            1
+            for batch in snippet_batches
+            if not (batch.needs_std_module or batch.needs_aeronet_module)
         )
-        # Only pass cxx_compiler when snippets use modules (must match the
-        # compiler that produced the .pcm files).
-        snippet_cxx = cxx if (needs_std or needs_aeronet) else None
-        cmake_build_dir = tmp_path / "cmake-build"
-        if not configure_cmake_project(
-            args.cmake,
-            tmp_path,
-            cmake_build_dir,
-            args.generator,
-            build_type,
-            snippet_cxx,
-        ):
-            sys.exit(1)
-
-        failures = 0
-        job_limit = args.jobs if args.jobs and args.jobs > 1 else None
-        if job_limit:
-            future_to_idx: dict[concurrent.futures.Future, int] = {}
-            with concurrent.futures.ThreadPoolExecutor(
-                max_workers=job_limit
-            ) as executor:
-                for idx, target in enumerate(snippet_batches, start=1):
-                    future = executor.submit(
-                        build_snippet_batch_task,
-                        idx,
-                        target,
-                        args.cmake,
-                        cmake_build_dir,
+        precompiled_header = None
+        if not args.no_pch and plain_batches > 1:
+            precompiled_header = write_precompiled_header(tmp_path)
+
+        # Compile through the same ccache as the aeronet build. Paths below the work dir
+        # are rewritten relative to it, and the cwd is left out of the hash, so cached
+        # results survive the per-run temporary directory. Only the compile and build
+        # subprocesses get these settings, and values already in the environment win.
+        launcher = compiler_launcher(build_dir)
+        compile_env: Optional[Dict[str, str]] = None
+        if launcher:
+            compile_env = dict(os.environ)
+            compile_env.setdefault("CCACHE_BASEDIR", str(tmp_path))
+            compile_env.setdefault("CCACHE_NOHASHDIR", "1")
+            if precompiled_header:
+                compile_env.setdefault("CCACHE_SLOPPINESS", "pch_defines,time_macros")
+
+        built_batches: List[SnippetBatch] = []
+        if not args.use_cmake:
+            compile_prefix = direct_compile_prefix(
+                cxx, build_type, include_dirs, compile_definitions, compile_options
+            )
+            if precompiled_header and not build_precompiled_header(
+                precompiled_header, compile_prefix
+            ):
+                precompiled_header = None
+
+            def submit_batches(
+                executor: concurrent.futures.Executor,
+                module_batches: bool,
+                std_pcm_path: Optional[Path] = None,
+                aeronet_module: Optional[ModulePaths] = None,
+            ) -> List[Tuple[SnippetBatch, concurrent.futures.Future]]:
+                return [
+                    (
+                        batch,
+                        executor.submit(
+                            build_snippet_batch_directly,
+                            idx,
+                            batch,
+                            direct_batch_commands(
+                                batch,
+                                compile_prefix,
+                                link_entries,
+                                sanitize_flags,
+                                args.link,
+                                std_pcm_path,
+                                aeronet_module,
+                                libcxx,
+                                launcher,
+                                precompiled_header,
+                                args.syntax_only,
+                            ),
+                            compile_env,
+                        ),
                     )
-                    future_to_idx[future] = idx
-                for future in concurrent.futures.as_completed(future_to_idx):
-                    idx = future_to_idx[future]
-                    try:
-                        success = future.result()
-                    except Exception as exc:
-                        print(
-                            f"Unexpected error building batch #{idx}: {exc}",
-                            file=sys.stderr,
-                        )
-                        failures += 1
-                        continue
-                    if not success:
-                        failures += 1
+                    for idx, batch in enumerate(snippet_batches, start=1)
+                    if (batch.needs_std_module or batch.needs_aeronet_module) == module_batches
+                ]
+
+            workers = args.jobs if args.jobs and args.jobs > 0 else os.cpu_count() or 1
+            with concurrent.futures.ThreadPoolExecutor(max_workers=workers) as executor:
+                # Batches without module imports compile while the modules are precompiled.
+                submitted = submit_batches(executor, module_batches=False)
+                submitted += submit_batches(executor, True, *build_modules())
+                built_batches = [batch for batch, future in submitted if future.result()]
+                failures = len(submitted) - len(built_batches)
         else:
-            for idx, target in enumerate(snippet_batches, start=1):
-                if not build_snippet_batch_task(idx, target, args.cmake, cmake_build_dir):
-                    failures += 1
+            std_pcm_path, aeronet_module = build_modules()
+            write_cmake_project(
+                tmp_path,
+                snippet_batches,
+                include_dirs,
+                compile_definitions,
+                compile_options,
+                libs,
+                dependency_libs,
+                dependency_link_flags,
+                SYSTEM_LINK_FLAGS,
+                sanitize_flags,
+                args.link,
+                std_pcm_path,
+                aeronet_module,
+                libcxx,
+                launcher,
+                precompiled_header,
+            )
+
+            # Only pass cxx_compiler when snippets use modules (must match the
+            # compiler that produced the .pcm files).
+            snippet_cxx = cxx if (needs_std or needs_aeronet) else None
+            cmake_build_dir = tmp_path / "cmake-build"
+            if not configure_cmake_project(
+                args.cmake,
+                tmp_path,
+                cmake_build_dir,
+                args.generator,
+                build_type,
+                snippet_cxx,
+            ):
+                sys.exit(1)
+
+            # An output left over from an earlier run in a persistent work dir, or from a
+            # generator that stops at the first error, would otherwise pass for a success.
+            for batch in snippet_batches:
+                cmake_batch_output(cmake_build_dir, batch, args.link).unlink(missing_ok=True)
+
+            print(f"Building {len(snippet_batches)} batch targets in a single cmake --build")
+            if build_all_cmake_targets(
+                args.cmake,
+                cmake_build_dir,
+                [batch.target for batch in snippet_batches],
+                args.jobs,
+                args.generator,
+                compile_env,
+            ):
+                built_batches = snippet_batches
+                failures = 0
+            else:
+                # Compilers remove their output on error, so after a keep-going build only
+                # the batches without an output need rebuilding to report their failure.
+                failed_batches: List[Tuple[int, SnippetBatch]] = []
+                for idx, batch in enumerate(snippet_batches, start=1):
+                    if cmake_batch_output(cmake_build_dir, batch, args.link).is_file():
+                        built_batches.append(batch)
+                    else:
+                        failed_batches.append((idx, batch))
+                failures = build_snippet_batches(
+                    failed_batches,
+                    args.cmake,
+                    cmake_build_dir,
+                    args.jobs,
+                    compile_env,
+                )
+
+        built_keys = {snippet_keys[snippet.index] for snippet in snippets} & known_good
+        built_keys.update(
+            snippet_keys[snippet.index] for batch in built_batches for snippet in batch.snippets
+        )
+        save_snippet_manifest(manifest_path, built_keys)
 
+    unchanged_note = f" ({unchanged} unchanged since a successful build)" if unchanged else ""
     print(
-        f"Checked {len(snippets)} code snippets and {checked_links} internal "
+        f"Checked {len(snippets)} code snippets{unchanged_note} and {checked_links} internal "
         f"Markdown links in {len(snippet_batches)} batches, {failures} failures"
     )
     sys.exit(failures)